@@ -0,0 +1,121 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config
+from src.clients import ClientPool, format_metrics
+
+# Verifies the shared client layer against a local mock OpenAI server: the limiter
+# must cap concurrent requests and keep-alive must reuse connections across clients.
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    def __init__(self, latency):
+        super().__init__(('127.0.0.1', 0), MockOpenAIHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.client_ports = set()
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            server.client_ports.add(self.client_address[1])
+
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(server.latency)
+
+        if self.path.endswith('/embeddings'):
+            inputs = request['input'] if isinstance(request['input'], list) else [request['input']]
+            payload = {
+                'object': 'list', 'model': request['model'],
+                'data': [{'object': 'embedding', 'index': i, 'embedding': [0.1] * 8} for i in range(len(inputs))],
+                'usage': {'prompt_tokens': 1, 'total_tokens': 1}
+            }
+        else:
+            payload = {
+                'id': 'mock', 'object': 'chat.completion', 'created': 0, 'model': request['model'],
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'Not found'}}],
+                'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+            }
+
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+        with server.lock:
+            server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        return
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the shared HTTP client pool against a local mock server')
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--limit', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    config = Config(create_directories=False)
+    config.OPENAI_BASE_URL = f'http://127.0.0.1:{server.server_address[1]}/v1'
+    config.MAX_CONCURRENT_REQUESTS = args.limit
+    config.HTTP2 = False
+    pool = ClientPool(config)
+
+    # Separate LangChain clients, as the stages create them, all on the one pool
+    chat = pool.chat_model(config.LLM_MODEL, 0)
+    embeddings = pool.embeddings(config.EMBEDDING_MODEL)
+    # Skip tiktoken length checks so the check runs without downloading encodings
+    embeddings.check_embedding_ctx_length = False
+
+    def call(i):
+        if i % 2:
+            chat.invoke('ping')
+        else:
+            embeddings.embed_query('ping')
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(call, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    metrics = pool.metrics()
+    print(f"{args.requests} requests in {elapsed:.2f}s: {format_metrics(metrics)}")
+    print(f"server saw peak {server.peak_in_flight} concurrent requests on {len(server.client_ports)} connections")
+
+    failures = []
+    if server.peak_in_flight > args.limit:
+        failures.append(f"server saw {server.peak_in_flight} concurrent requests, limit is {args.limit}")
+    if len(server.client_ports) > config.HTTP_MAX_CONNECTIONS:
+        failures.append(f"{len(server.client_ports)} connections opened, pool max is {config.HTTP_MAX_CONNECTIONS}")
+    if metrics['total_requests'] != args.requests:
+        failures.append(f"limiter counted {metrics['total_requests']} of {args.requests} requests")
+
+    pool.close()
+    server.shutdown()
+
+    if failures:
+        print('\n'.join(failures))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
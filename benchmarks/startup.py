@@ -0,0 +1,66 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Guards CLI startup: `--help` and `status` must not import the ML stack and
+# must stay under a wall-clock budget. Exits non-zero on regression.
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ['pandas', 'numpy', 'langchain', 'langchain_openai', 'langchain_community', 'faiss', 'pymupdf', 'pydantic']
+
+COMMANDS = {
+    'help': ['main.py', '--help'],
+    'status': ['main.py', 'status', 'benchmark_nonexistent_conference'],
+}
+
+def measure(command, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *command], cwd=REPO_ROOT, capture_output=True, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def imported_heavy_modules(command):
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', *command],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+
+    imported = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        module = line.rsplit('|', 1)[-1].strip()
+        if module.split('.')[0] in HEAVY_MODULES:
+            imported.add(module.split('.')[0])
+    return sorted(imported)
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure main.py startup time and heavy imports')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=0.5, help='Maximum median seconds per command')
+    args = parser.parse_args()
+
+    baseline = measure(['-c', 'pass'], args.repeats)
+    print(f"{'interpreter':<10} {baseline * 1000:8.1f} ms")
+
+    failed = False
+    for name, command in COMMANDS.items():
+        median = measure(command, args.repeats)
+        heavy = imported_heavy_modules(command)
+
+        print(f"{name:<10} {median * 1000:8.1f} ms  heavy imports: {', '.join(heavy) or 'none'}")
+        if heavy or median > args.budget:
+            failed = True
+
+    if failed:
+        print(f"Startup regression: heavy modules imported or median above {args.budget:.2f}s")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
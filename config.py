@@ -1,8 +1,9 @@
 import shutil
 from pathlib import Path
+from src.outcomes import OutcomeLog
 
 class Config:
-    def __init__(self, conference_name=None):
+    def __init__(self, conference_name=None, create_directories=True):
         self.conference_name = conference_name or 'untitled'
         self.DATA_DIR = Path('data') / self.conference_name
 
@@ -11,7 +12,14 @@ class Config:
         self.VECTOR_STORE_DIR = self.DATA_DIR / 'vector_stores'
         self.RESULT_DIR = self.DATA_DIR / 'results'
 
-        self._create_directories()
+        # Shared across conferences
+        self.CORPUS_DIR = Path('data') / 'corpus'
+
+        # Per-paper ok/not_found/transient_error/permanent_error state for every stage
+        self.outcomes = OutcomeLog(self.DATA_DIR / 'outcomes.json')
+
+        if create_directories:
+            self._create_directories()
         self._setup_configuration()
 
     def _create_directories(self):
@@ -23,13 +31,97 @@ class Config:
             dir_path.mkdir(parents=True, exist_ok=True)
 
     def _setup_configuration(self):
+        # 'layout' drops running headers/footers, ACM boilerplate and everything from
+        # the References heading on, and records section headings; 'plain' dumps all text
+        self.PARSE_MODE = 'layout'
+        self.PARSE_MARGIN_RATIO = 0.07
+
         self.CHUNK_SIZE = 1000
         self.CHUNK_OVERLAP = 200
 
+        self.RETRIEVAL_QUERIES = [
+            "participants task implementation coding programming development",
+            "user study methodology procedure experiment task assignment",
+            "participants asked implement develop write code program",
+            "evaluation task programming activity coding exercise"
+        ]
+        self.RETRIEVAL_K = 2
+        self.MAX_CONTEXT_CHUNKS = 6
+
+        # Default grid for `main.py sweep`
+        self.SWEEP_CHUNK_SIZES = [500, 750, 1000, 1500]
+        self.SWEEP_CHUNK_OVERLAPS = [0, 100, 200]
+        self.SWEEP_RETRIEVAL_KS = [1, 2, 3]
+        self.SWEEP_MAX_CONTEXT_CHUNKS = [4, 6, 8]
+
+        # 'openai' uses EMBEDDING_MODEL over the API; 'hashing' is a local CPU-only
+        # backend for offline/air-gapped runs. Stores must be queried with the backend that built them
+        self.EMBEDDING_BACKEND = 'openai'
         self.EMBEDDING_MODEL = 'text-embedding-3-small'
+        self.LOCAL_EMBEDDING_DIM = 1024
+
+        # Per-paper vector store format: 'faiss' (LangChain flat float32 + pickled docstore),
+        # or a compressed index whose docstore points back into the split JSON: 'fp16' or
+        # 'sq8' (8-bit scalar quantization). VECTOR_TRUNCATE_DIM keeps only the leading
+        # dimensions of each vector. Compare them on existing stores with `main.py compress-report`
+        self.VECTOR_STORE_FORMAT = 'faiss'
+        self.VECTOR_TRUNCATE_DIM = None
+
+        # csv is always written incrementally; parquet/arrow are typed copies exported per stage
+        self.OUTPUT_FORMATS = ['csv', 'parquet']
+
+        # One pooled HTTP client and request limiter is shared by every LLM/embedding
+        # client in the process; set CLIENT_POOL to inject a different ClientPool
+        self.CLIENT_POOL = None
+        self.OPENAI_BASE_URL = None
+        self.HTTP2 = True
+        self.HTTP_TIMEOUT = 60.0
+        self.HTTP_CONNECT_TIMEOUT = 10.0
+        self.HTTP_MAX_CONNECTIONS = 20
+        self.HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+        self.HTTP_KEEPALIVE_EXPIRY = 30.0
+        self.MAX_CONCURRENT_REQUESTS = 8
+
+        self.RETRY_MAX_ATTEMPTS = 4
+        self.RETRY_BASE_DELAY = 2.0
+        self.RETRY_MAX_DELAY = 30.0
+
+        # Corpus-wide ANN search over all chunks and task summaries ('hnsw', 'ivf' or 'flat')
+        self.CORPUS_INDEX_TYPE = 'hnsw'
+        self.CORPUS_HNSW_M = 32
+        self.CORPUS_HNSW_EF_CONSTRUCTION = 80
+        self.CORPUS_HNSW_EF_SEARCH = 64
+        self.CORPUS_IVF_NLIST = 1024
+        self.CORPUS_IVF_NPROBE = 16
+        self.CORPUS_SEARCH_OVERFETCH = 10
+        # Removed or replaced papers are tombstoned; the index is compacted once
+        # tombstones make up more than this share of it
+        self.CORPUS_COMPACT_RATIO = 0.2
+        self.CORPUS_AUTO_UPDATE = True
 
         self.LLM_MODEL = 'gpt-4o-mini'
         self.LLM_TEMPERATURE = 0.2
+
+        # 'cascade' tries CHEAP_LLM_MODEL first (checked against keyword rules and, with
+        # more than one sample, self-consistency) and escalates to LLM_MODEL when unsure
+        self.CATEGORIZER_MODE = 'single'
+        self.CHEAP_LLM_MODEL = 'gpt-4.1-nano'
+        self.CASCADE_CONSISTENCY_SAMPLES = 1
+        # USD per 1M (input, output) tokens, used for the cascade cost report
+        self.MODEL_PRICES = {
+            'gpt-4o-mini': (0.15, 0.60),
+            'gpt-4.1-nano': (0.10, 0.40),
+            'gpt-4.1-mini': (0.40, 1.60),
+            'gpt-4o': (2.50, 10.00),
+        }
+        # Rough seconds per categorization call, used to estimate the cascade's latency
+        # saving when no paper escalated and no earlier run measured the primary model
+        self.MODEL_LATENCY_SECONDS = {
+            'gpt-4o-mini': 4.0,
+            'gpt-4.1-nano': 2.0,
+            'gpt-4.1-mini': 4.0,
+            'gpt-4o': 6.0,
+        }
         self.SYSTEM_PROMPT = """
         You are an expert research assistant specializing in extracting raw factual information from computer science and software engineering research papers.
 
@@ -136,15 +228,27 @@ class Config:
         cleanup_map = {
             'process': self.DATA_DIR / f"{self.conference_name}_papers_dict.json",
             'parse': self.PARSED_PAPER_DIR,
-            'split': self.SPLIT_TEXT_DIR,
+            # Vector stores refer to chunks by position, so new splits invalidate them
+            'split': [self.SPLIT_TEXT_DIR, self.VECTOR_STORE_DIR],
             'embed': self.VECTOR_STORE_DIR,
-            'extract': self.RESULT_DIR / f"results_{self.conference_name}_intermediate.csv",
-            'categorize': self.RESULT_DIR / f"results_{self.conference_name}.csv"
+            'extract': [
+                self.RESULT_DIR / f"results_{self.conference_name}_intermediate.{suffix}"
+                for suffix in ('csv', 'parquet', 'arrow')
+            ],
+            'categorize': [
+                self.RESULT_DIR / f"results_{self.conference_name}.{suffix}"
+                for suffix in ('csv', 'parquet', 'arrow')
+            ]
         }
 
         for step in steps:
-            if step in cleanup_map:
-                target = cleanup_map[step]
+            if step not in cleanup_map:
+                continue
+            self.outcomes.clear(step)
+            targets = cleanup_map[step]
+            if not isinstance(targets, list):
+                targets = [targets]
+            for target in targets:
                 if target.exists():
                     if target.is_dir():
                         shutil.rmtree(target)
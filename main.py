@@ -1,17 +1,14 @@
 from dotenv import load_dotenv
 load_dotenv()
-import pandas as pd
 import argparse
 import glob
+import sys
 from pathlib import Path
 from config import Config
-from src.data_processor import DataProcessor
-from src.pdf_parser import PDFParser
-from src.text_splitter import TextSplitter
-from src.embedder import Embedder
-from src.rag_extractor import RAGExtractor
-from src.task_categorizer import TaskCategorizer
-from src.csv_writer import CSVWriter
+from src.outcomes import OK, ERROR_STATES
+
+# Stage modules pull in pandas, langchain, FAISS and pymupdf, so they are only
+# imported once a step that needs them actually runs
 
 def extract_conference_name(csv_file_path):
     filename = Path(csv_file_path).stem  # remove .csv extension
@@ -19,7 +16,7 @@ def extract_conference_name(csv_file_path):
         return filename.replace('_coding', '')
     return filename
 
-def parse_arguments():
+def parse_arguments(argv=None):
     parser = argparse.ArgumentParser(
         description='Extract and categorize coding tasks from CHI research papers',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -29,6 +26,13 @@ def parse_arguments():
         python main.py chi_24_coding.csv chi_25_coding.csv
         python main.py chi_*.csv --force
         python main.py chi_25_coding.csv --only parse,embed,extract
+        python main.py chi_25_coding.csv --retry-failed
+        python main.py status chi_25_coding.csv
+        python main.py watch chi_25_coding.csv --port 8765
+        python main.py index chi_22 chi_23 chi_24 chi_25
+        python main.py search "participants debugged Python with an LLM assistant" -k 10
+        python main.py sweep chi_25 --backend hashing
+        python main.py compress-report chi_25 --formats fp16,sq8 --truncate 512
         """
     )
 
@@ -42,48 +46,266 @@ def parse_arguments():
         help='Force rerun all steps (cleans intermediate files)'
     )
 
+    parser.add_argument(
+        '--retry-failed', action='store_true',
+        help='Only reprocess papers whose last attempt errored in each step'
+    )
+
     parser.add_argument(
         '--only', type=str,
         help='Run only specified steps (use comma-separated names): parse,section,split,embed,extract,categorize'
     )
 
-    return parser.parse_args()
+    return parser.parse_args(argv)
+
+def parse_status_arguments(argv):
+    parser = argparse.ArgumentParser(
+        prog='main.py status',
+        description='Report per-stage completion counts without loading the ML stack'
+    )
+
+    parser.add_argument(
+        'conferences', nargs='+',
+        help='Conference names or CSV file(s) (can use wildcards like chi_*.csv)'
+    )
+
+    return parser.parse_args(argv)
+
+def parse_watch_arguments(argv):
+    parser = argparse.ArgumentParser(
+        prog='main.py watch',
+        description='Keep clients warm and process new or changed papers as they arrive'
+    )
+
+    parser.add_argument(
+        'input_file',
+        help='Zotero CSV file to watch for new or changed entries'
+    )
+
+    parser.add_argument(
+        '--inbox', type=str,
+        help='Directory to watch for new PDFs (default: data/<conference>/inbox)'
+    )
+
+    parser.add_argument(
+        '--interval', type=float, default=10.0,
+        help='Seconds between scans of the CSV and inbox'
+    )
+
+    parser.add_argument(
+        '--host', type=str, default='127.0.0.1',
+        help='Host for the local HTTP endpoint'
+    )
+
+    parser.add_argument(
+        '--port', type=int, default=8765,
+        help='Port for the local HTTP endpoint (0 disables it)'
+    )
+
+    return parser.parse_args(argv)
+
+def parse_index_arguments(argv):
+    parser = argparse.ArgumentParser(
+        prog='main.py index',
+        description='Add chunk vectors and task summaries to the corpus-wide ANN index'
+    )
+
+    parser.add_argument(
+        'conferences', nargs='+',
+        help='Conference names or CSV file(s) (can use wildcards like chi_*.csv)'
+    )
+
+    parser.add_argument(
+        '--rebuild', action='store_true',
+        help='Drop the existing corpus index before indexing'
+    )
+
+    return parser.parse_args(argv)
+
+def parse_search_arguments(argv):
+    parser = argparse.ArgumentParser(
+        prog='main.py search',
+        description='Search all indexed papers by chunk text and task summary'
+    )
+
+    parser.add_argument('query', help='Free-text query')
+
+    parser.add_argument(
+        '-k', type=int, default=10,
+        help='Number of papers to return'
+    )
+
+    parser.add_argument(
+        '--conferences', nargs='+',
+        help='Only return papers from these conferences'
+    )
+
+    parser.add_argument(
+        '--kind', choices=['chunks', 'summaries', 'both'], default='both',
+        help='Search chunk vectors, task summary vectors, or both'
+    )
+
+    return parser.parse_args(argv)
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(',')]
+
+def parse_sweep_arguments(argv):
+    parser = argparse.ArgumentParser(
+        prog='main.py sweep',
+        description='Evaluate chunking/retrieval settings against labelled task passages (cost vs recall)'
+    )
+
+    parser.add_argument(
+        'conference',
+        help='Conference name or CSV file whose cached parses and results to use'
+    )
+
+    parser.add_argument(
+        '--labels', type=str,
+        help='CSV with paper_id,passage rows (default: quotes from past extraction results, '
+             'which favour the production settings)'
+    )
+
+    parser.add_argument(
+        '--backend', type=str,
+        help='Embedding backend to use instead of Config.EMBEDDING_BACKEND (e.g. hashing for offline runs)'
+    )
+
+    parser.add_argument('--chunk-sizes', type=parse_int_list, help='Comma-separated chunk sizes')
+    parser.add_argument('--overlaps', type=parse_int_list, help='Comma-separated chunk overlaps')
+    parser.add_argument('--ks', type=parse_int_list, help='Comma-separated chunks retrieved per query')
+    parser.add_argument('--max-chunks', type=parse_int_list, help='Comma-separated context chunk caps')
+
+    return parser.parse_args(argv)
+
+def parse_compress_report_arguments(argv):
+    parser = argparse.ArgumentParser(
+        prog='main.py compress-report',
+        description='Compare compressed vector store formats against the existing float32 stores'
+    )
+
+    parser.add_argument(
+        'conference',
+        help='Conference name or CSV file whose vector stores to compare'
+    )
+
+    parser.add_argument(
+        '--formats', type=str, default='fp16,sq8',
+        help='Comma-separated formats to evaluate: fp16,sq8'
+    )
+
+    parser.add_argument(
+        '--truncate', type=int,
+        help='Keep only the leading dimensions of each vector (default: Config.VECTOR_TRUNCATE_DIM)'
+    )
+
+    parser.add_argument(
+        '--backend', type=str,
+        help='Embedding backend the stores were built with, if not Config.EMBEDDING_BACKEND'
+    )
+
+    parser.add_argument(
+        '--max-papers', type=int,
+        help='Only compare the first N papers'
+    )
+
+    return parser.parse_args(argv)
+
+def expand_input_files(patterns):
+    input_files = []
+    for pattern in patterns:
+        expanded = glob.glob(pattern)
+        if expanded:
+            input_files.extend(expanded)
+        else:
+            input_files.append(pattern)
+    return input_files
 
 class CodingTaskExtractor:
     def __init__(self, conference_name=None):
         self.config = Config(conference_name=conference_name)
-        self.data_processor = DataProcessor(self.config)
-        self.pdf_parser = PDFParser(self.config)
-        self.text_splitter = TextSplitter(self.config)
-        self.csv_writer = CSVWriter(self.config)
 
-        # Initialize OpenAI components lazily
+        # All stage components are created (and their modules imported) lazily
+        self._data_processor = None
+        self._pdf_parser = None
+        self._text_splitter = None
+        self._result_writer = None
         self._embedder = None
         self._rag_extractor = None
         self._task_categorizer = None
+        self._corpus_index = None
+
+    @property
+    def data_processor(self):
+        if self._data_processor is None:
+            from src.data_processor import DataProcessor
+            self._data_processor = DataProcessor(self.config)
+        return self._data_processor
+
+    @property
+    def pdf_parser(self):
+        if self._pdf_parser is None:
+            from src.pdf_parser import PDFParser
+            self._pdf_parser = PDFParser(self.config)
+        return self._pdf_parser
+
+    @property
+    def text_splitter(self):
+        if self._text_splitter is None:
+            from src.text_splitter import TextSplitter
+            self._text_splitter = TextSplitter(self.config)
+        return self._text_splitter
+
+    @property
+    def result_writer(self):
+        if self._result_writer is None:
+            from src.result_writer import ResultWriter
+            self._result_writer = ResultWriter(self.config)
+        return self._result_writer
 
     @property
     def embedder(self):
         if self._embedder is None:
+            from src.embedder import Embedder
             self._embedder = Embedder(self.config)
         return self._embedder
 
     @property
     def rag_extractor(self):
         if self._rag_extractor is None:
+            from src.rag_extractor import RAGExtractor
             self._rag_extractor = RAGExtractor(self.config)
         return self._rag_extractor
 
     @property
     def task_categorizer(self):
         if self._task_categorizer is None:
+            from src.task_categorizer import TaskCategorizer
             self._task_categorizer = TaskCategorizer(self.config)
         return self._task_categorizer
 
-    def run_pipeline(self, csv_file_path, steps=None, force=False):
+    @property
+    def corpus_index(self):
+        if self._corpus_index is None:
+            from src.corpus_index import CorpusIndex
+            self._corpus_index = CorpusIndex(self.config)
+        return self._corpus_index
+
+    def update_corpus_index(self):
+        if not self.config.CORPUS_AUTO_UPDATE:
+            return
+        try:
+            self.corpus_index.update(self.config.conference_name)
+        except Exception as e:
+            print(f"Error updating corpus index: {e}")
+
+    def run_pipeline(self, csv_file_path, steps=None, force=False, retry_failed=False):
         if steps is None:
             steps = ['parse', 'split', 'embed', 'extract', 'categorize']
 
+        outcomes = self.config.outcomes
+
         print(f"Starting coding task extraction pipeline for {csv_file_path}")
         print(f"Conference: {self.config.conference_name}")
         print(f"Running steps: {', '.join(steps)}")
@@ -93,63 +315,314 @@ class CodingTaskExtractor:
         papers_dict = self.data_processor.process_papers(csv_file_path)
         print(f"Found {len(papers_dict)} papers to process")
 
+        # With --retry-failed each stage only reprocesses papers that errored in it,
+        # plus papers whose previous stage recovered during this run
+        recovered = set()
+
+        def retry_ids(stage):
+            if not retry_failed:
+                return None
+            ids = outcomes.failed(stage) | recovered
+            print(f"Retrying {len(ids)} papers for {stage}")
+            return ids
+
+        def recovered_ids(stage, ids):
+            if not retry_failed:
+                return set()
+            return {paper_id for paper_id in ids if outcomes.state(stage, paper_id) == OK}
+
         # Step 2: Parse PDFs
         if 'parse' in steps:
             print("Parsing PDFs...")
-            self.pdf_parser.parse_all_pdfs(papers_dict)
+            ids = retry_ids('parse')
+            if ids is None:
+                self.pdf_parser.parse_all_pdfs(papers_dict)
+            else:
+                self.pdf_parser.parse_all_pdfs({paper_id: papers_dict[paper_id] for paper_id in ids if paper_id in papers_dict})
+            recovered = recovered_ids('parse', ids)
+            outcomes.flush()
 
         # Step 3: Split text
         if 'split' in steps:
             print("Splitting text...")
-            self.text_splitter.split_all_texts()
+            ids = retry_ids('split')
+            self.text_splitter.split_all_texts(paper_ids=ids)
+            recovered = recovered_ids('split', ids)
+            outcomes.flush()
 
         # Step 4: Create embeddings
         if 'embed' in steps:
             print("Creating embeddings...")
-            self.embedder.embed_all_splits()
+            ids = retry_ids('embed')
+            self.embedder.embed_all_splits(paper_ids=ids)
+            recovered = recovered_ids('embed', ids)
+            outcomes.flush()
 
         # Step 5: Extract coding tasks
         if 'extract' in steps:
             print("Extracting coding tasks...")
-            coding_tasks = self.rag_extractor.extract_all_tasks()
+            ids = retry_ids('extract')
+            if ids is None:
+                self.result_writer.start_intermediate()
+            coding_tasks = self.rag_extractor.extract_all_tasks(
+                paper_ids=ids, on_result=self.result_writer.append_task
+            )
+            recovered = recovered_ids('extract', ids)
+            outcomes.flush()
 
             na_count = sum(1 for task in coding_tasks.values() if task == 'Not found')
             print(f'Number of extracted coding tasks: {len(coding_tasks) - na_count}')
 
-            print("Saving extracted results...")
-            self.csv_writer.write_results_to_csv_intermediate(papers_dict, coding_tasks)
+            self.result_writer.finish_intermediate()
         else:
             coding_tasks = {}
 
         # Step 6: Categorize tasks
         if 'categorize' in steps:
-            if 'extract' not in steps:
-                intermediate_file = self.config.RESULT_DIR / f"results_{self.config.conference_name}_intermediate.csv"
-                df = pd.read_csv(intermediate_file)
-                coding_tasks = df.set_index('paper_id')['coding_task'].to_dict()
+            ids = retry_ids('categorize')
+            if 'extract' not in steps or ids is not None:
+                coding_tasks = self.result_writer.read_coding_tasks()
+            if ids is not None:
+                coding_tasks = {paper_id: task for paper_id, task in coding_tasks.items() if paper_id in ids}
+
+            def save_result(paper_id, task_categories):
+                if paper_id in papers_dict:
+                    self.result_writer.append_result(
+                        paper_id, papers_dict[paper_id], coding_tasks[paper_id], task_categories
+                    )
 
             print("Categorizing tasks...")
-            results = self.task_categorizer.categorize_all_tasks(coding_tasks)
+            if ids is None:
+                self.result_writer.start_results()
+            self.task_categorizer.categorize_all_tasks(coding_tasks, on_result=save_result)
+            outcomes.flush()
 
-            print("Saving categorized results...")
-            self.csv_writer.write_results_to_csv(papers_dict, coding_tasks, results)
+            self.result_writer.finish_results()
+            self.update_corpus_index()
+            self.print_outcomes(steps)
+            self.print_client_metrics()
 
             return
 
+        if 'embed' in steps:
+            self.update_corpus_index()
+        self.print_outcomes(steps)
+        self.print_client_metrics()
         print("Pipeline completed.")
         return
 
+    def print_outcomes(self, steps):
+        for step in steps:
+            counts = self.config.outcomes.counts(step)
+            if counts:
+                summary = ', '.join(f"{state}={count}" for state, count in sorted(counts.items()))
+                print(f"Outcomes for {step}: {summary}")
+
+    def print_client_metrics(self):
+        if self.config.CLIENT_POOL is not None:
+            from src.clients import format_metrics
+            print(f"HTTP clients: {format_metrics(self.config.CLIENT_POOL.metrics())}")
+
+    def process_paper(self, paper_id, metadata):
+        # Single-paper parse→categorize path used by watch mode; reuses the warm
+        # clients and hands the freshly built vector store straight to extraction.
+        # Each stage records its outcome, so failures here show up for --retry-failed
+        split_path = self.config.SPLIT_TEXT_DIR / f'{paper_id}.json'
+
+        if self.pdf_parser.parse_paper(paper_id, metadata['pdf_path']) is None:
+            return {'paper_id': paper_id, 'error': self.config.outcomes.state('parse', paper_id)}
+
+        if split_path.exists():
+            split_path.unlink()
+        if not self.text_splitter.split_paper(paper_id):
+            state = self.config.outcomes.state('split', paper_id)
+            if state in ERROR_STATES:
+                return {'paper_id': paper_id, 'error': state}
+            return self.save_not_found(paper_id, metadata)
+
+        vector_store = self.embedder.embed_paper(paper_id)
+        if vector_store is None:
+            return {'paper_id': paper_id, 'error': self.config.outcomes.state('embed', paper_id)}
+
+        coding_task = self.rag_extractor.extract_paper(paper_id, vector_store=vector_store)
+        if coding_task is None:
+            return {'paper_id': paper_id, 'error': self.config.outcomes.state('extract', paper_id)}
+        if coding_task.strip() == 'Not found':
+            return self.save_not_found(paper_id, metadata, vector_store=vector_store)
+
+        # Overwrite rather than append, so a changed paper keeps a single row and a
+        # failed categorization does not leave the previous one in place
+        self.result_writer.remove_paper(paper_id)
+        self.result_writer.append_task(paper_id, coding_task)
+
+        result = {'paper_id': paper_id, 'coding_task': coding_task}
+        categories = self.task_categorizer.categorize_paper(paper_id, coding_task)
+        if categories is None:
+            result['error'] = self.config.outcomes.state('categorize', paper_id)
+            return result
+        self.result_writer.append_result(paper_id, metadata, coding_task, categories)
+        self.index_paper(paper_id, vector_store=vector_store, summary=categories['task_summary'])
+
+        result.update(categories)
+        return result
+
+    def save_not_found(self, paper_id, metadata, vector_store=None):
+        # An explicit row replaces any earlier categorization of this paper
+        self.result_writer.remove_paper(paper_id)
+        self.result_writer.append_task(paper_id, 'Not found')
+        self.result_writer.append_result(paper_id, metadata, 'Not found', {})
+        self.index_paper(paper_id, vector_store=vector_store)
+        return {'paper_id': paper_id, 'coding_task': 'Not found'}
+
+    def index_paper(self, paper_id, vector_store=None, summary=None):
+        # Replaces the paper's chunks and summary in the corpus index after reprocessing
+        if not self.config.CORPUS_AUTO_UPDATE:
+            return
+        conference = self.config.conference_name
+        try:
+            if vector_store is not None:
+                self.corpus_index.add_paper_chunks(conference, paper_id, vector_store=vector_store)
+            if summary:
+                self.corpus_index.add_summaries(conference, {paper_id: summary})
+            else:
+                self.corpus_index.remove_papers('summaries', [(conference, paper_id)])
+        except Exception as e:
+            print(f"Error updating corpus index: {e}")
+
+    def cascade_report(self):
+        # None unless a paper went through the categorization cascade in this process
+        if self._task_categorizer is None or self._task_categorizer.cascade is None:
+            return None
+        return self._task_categorizer.cascade.report()
+
+    def save_cascade_report(self):
+        if self._task_categorizer is not None:
+            self._task_categorizer.save_cascade_report()
+
+    def export_results(self):
+        self.result_writer.finish_intermediate()
+        self.result_writer.finish_results()
+        # Papers indexed by index_paper are saved here, once per batch rather than per paper
+        if self._corpus_index is not None and self._corpus_index.meta is not None:
+            try:
+                self._corpus_index.save()
+            except Exception as e:
+                print(f"Error saving corpus index: {e}")
+
+def run_status(argv):
+    from src.status import print_status
+
+    args = parse_status_arguments(argv)
+    for name in expand_input_files(args.conferences):
+        config = Config(conference_name=extract_conference_name(name), create_directories=False)
+        print_status(config)
+
+def run_watch(argv):
+    from src.watcher import PaperWatcher
+
+    args = parse_watch_arguments(argv)
+    extractor = CodingTaskExtractor(conference_name=extract_conference_name(args.input_file))
+    watcher = PaperWatcher(extractor, args.input_file, inbox_dir=args.inbox)
+    watcher.serve_forever(interval=args.interval, host=args.host, port=args.port)
+
+def run_index(argv):
+    from src.corpus_index import CorpusIndex
+
+    args = parse_index_arguments(argv)
+    corpus_index = CorpusIndex(Config(create_directories=False))
+    if args.rebuild:
+        corpus_index.clear()
+    for name in expand_input_files(args.conferences):
+        corpus_index.update(extract_conference_name(name))
+
+def run_search(argv):
+    import time
+    from src.corpus_index import CorpusIndex, print_search_results
+
+    args = parse_search_arguments(argv)
+    corpus_index = CorpusIndex(Config(create_directories=False)).load()
+    kinds = None if args.kind == 'both' else [args.kind]
+
+    start = time.perf_counter()
+    hits = corpus_index.search(args.query, k=args.k, kinds=kinds, conferences=args.conferences)
+    print_search_results(hits, time.perf_counter() - start)
+
+def run_sweep(argv):
+    from src.sweep import ParameterSweep
+
+    args = parse_sweep_arguments(argv)
+    config = Config(conference_name=extract_conference_name(args.conference))
+    if args.backend:
+        config.EMBEDDING_BACKEND = args.backend
+
+    sweep = ParameterSweep(config)
+    labels = sweep.load_labels(args.labels)
+    if not labels:
+        print("No labelled passages found in the parsed papers; nothing to evaluate")
+        return
+    print(f"Evaluating {sum(len(passages) for passages in labels.values())} passages from {len(labels)} papers")
+    if sweep.label_source == 'results':
+        print(
+            "Warning: labels are quotes from past extraction results, which only saw chunks retrieved "
+            "with the production settings; recall is biased towards the row marked production. "
+            "Pass --labels with independently labelled passages for an unbiased comparison"
+        )
+
+    df = sweep.run(
+        labels,
+        chunk_sizes=args.chunk_sizes or config.SWEEP_CHUNK_SIZES,
+        chunk_overlaps=args.overlaps or config.SWEEP_CHUNK_OVERLAPS,
+        retrieval_ks=args.ks or config.SWEEP_RETRIEVAL_KS,
+        max_context_chunks=args.max_chunks or config.SWEEP_MAX_CONTEXT_CHUNKS
+    )
+    print(f"Reused {sweep.seeded} chunk vectors from the vector stores; embedded {sweep.cache_misses} uncached chunks")
+    print(df[df['pareto_tokens'] | df['pareto_time'] | df['production']].to_string(index=False))
+    sweep.save(df)
+
+def run_compress_report(argv):
+    from src.embedding_backends import get_embedding_model
+    from src.vector_store import COMPRESSED_FORMATS, CompressionReport
+
+    args = parse_compress_report_arguments(argv)
+    config = Config(conference_name=extract_conference_name(args.conference))
+    if args.backend:
+        config.EMBEDDING_BACKEND = args.backend
+    if args.truncate:
+        config.VECTOR_TRUNCATE_DIM = args.truncate
+
+    formats = args.formats.split(',')
+    unknown = [store_format for store_format in formats if store_format not in COMPRESSED_FORMATS]
+    if unknown:
+        print(f"Unknown formats: {', '.join(unknown)} (expected {', '.join(COMPRESSED_FORMATS)})")
+        return
+
+    report = CompressionReport(config, get_embedding_model(config))
+    df = report.run(formats, max_papers=args.max_papers)
+    if not df['papers'].iloc[0]:
+        print(f"No float32 vector stores found in {config.VECTOR_STORE_DIR}; embed with VECTOR_STORE_FORMAT='faiss' first")
+        return
+    print(df.to_string(index=False))
+    report.save(df)
+
+COMMANDS = {
+    'status': run_status,
+    'watch': run_watch,
+    'index': run_index,
+    'search': run_search,
+    'sweep': run_sweep,
+    'compress-report': run_compress_report,
+}
+
 def main():
-    args = parse_arguments()
+    argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        COMMANDS[argv[0]](argv[1:])
+        return
+
+    args = parse_arguments(argv)
 
     # wildcard file names
-    input_files = []
-    for pattern in args.input_files:
-        expanded = glob.glob(pattern)
-        if expanded:
-            input_files.extend(expanded)
-        else:
-            input_files.append(pattern)
+    input_files = expand_input_files(args.input_files)
 
     # Parse steps
     steps = None
@@ -175,7 +648,8 @@ def main():
         extractor.run_pipeline(
             csv_file_path=csv_file,
             steps=steps,
-            force=args.force
+            force=args.force,
+            retry_failed=args.retry_failed
         )
 
 if __name__ == "__main__":
@@ -0,0 +1,250 @@
+import json
+import re
+import time
+from collections import Counter
+from src.clients import get_client_pool
+from src.outcomes import run_with_retries
+from src.task_categorizer import TaskCategories
+
+EXTENSION_LANGUAGES = {
+    'py': 'Python', 'ipynb': 'Python', 'js': 'JavaScript', 'jsx': 'JavaScript', 'ts': 'TypeScript',
+    'tsx': 'TypeScript', 'java': 'Java', 'cpp': 'C++', 'cc': 'C++', 'hpp': 'C++', 'cs': 'C#',
+    'rb': 'Ruby', 'go': 'Go', 'rs': 'Rust', 'swift': 'Swift', 'kt': 'Kotlin', 'php': 'PHP',
+    'scala': 'Scala', 'sql': 'SQL', 'html': 'HTML', 'css': 'CSS',
+}
+
+LANGUAGE_PATTERNS = {
+    'Python': re.compile(r'\bpython\b|\bpandas\b|\bnumpy\b|\bjupyter\b|\bpip install\b', re.IGNORECASE),
+    'JavaScript': re.compile(r'\bjavascript\b|\bnode\.?js\b|\bnpm\b|\breact\b', re.IGNORECASE),
+    'TypeScript': re.compile(r'\btypescript\b', re.IGNORECASE),
+    'Java': re.compile(r'\bjava\b(?!script)', re.IGNORECASE),
+    'C++': re.compile(r'\bc\+\+', re.IGNORECASE),
+    'C#': re.compile(r'\bc#', re.IGNORECASE),
+    'Rust': re.compile(r'\brust\b', re.IGNORECASE),
+    'Kotlin': re.compile(r'\bkotlin\b', re.IGNORECASE),
+    'Swift': re.compile(r'\bswift\b', re.IGNORECASE),
+    'SQL': re.compile(r'\bsql\b', re.IGNORECASE),
+    # Case-sensitive so "implement it from scratch" does not count; block-based wording
+    # next to a lowercase "scratch" still does
+    'Scratch': re.compile(
+        r'(?<![Ff]rom )\bScratch(?:Jr)?\b|(?i:\bblock-based\b[^.]{0,60}\bscratch\b|\bscratch\b[^.]{0,60}\bblock-based\b)'
+    ),
+}
+
+AI_PATTERN = re.compile(
+    r'\bllms?\b|\bgpt[-\w]*|\bchatgpt\b|\bcopilot\b|\bcodex\b|large language model|'
+    r'\bai[- ](?:assistant|tool|model|powered|generated)|\bgenerative ai\b|\bmachine learning\b|\bneural\b',
+    re.IGNORECASE
+)
+
+EXTENSION_PATTERN = re.compile(r'(?<![\w/])\w*\.([a-z]{1,5})\b', re.IGNORECASE)
+
+VAGUE_VALUES = {'', 'not specified', 'unspecified', 'unknown', 'mixed', 'other', 'n/a', 'none', 'not mentioned'}
+
+REQUIRED_FIELDS = [
+    'task_summary', 'participant_skill_level', 'programming_language', 'task_type',
+    'is_programming_related', 'is_ai_related'
+]
+
+CONSISTENCY_FIELDS = ['participant_skill_level', 'programming_language', 'task_type', 'is_programming_related', 'is_ai_related']
+
+def rules_pass(task_description):
+    # Cheap local guesses for fields that keywords settle reliably
+    languages = []
+    for extension in EXTENSION_PATTERN.findall(task_description):
+        language = EXTENSION_LANGUAGES.get(extension.lower())
+        if language and language not in languages:
+            languages.append(language)
+    for language, pattern in LANGUAGE_PATTERNS.items():
+        if language not in languages and pattern.search(task_description):
+            languages.append(language)
+
+    return {
+        'programming_language': languages,
+        # Absence of AI keywords is not evidence either way, so only 'Yes' is asserted
+        'is_ai_related': 'Yes' if AI_PATTERN.search(task_description) else None,
+    }
+
+def _normalize(value):
+    return (value or '').strip().lower()
+
+def _language_matches(language, predicted):
+    # Compare whole list items ("Python 3", "JavaScript (Node.js)"), not substrings,
+    # so 'java' does not match 'javascript'
+    language = language.lower()
+    parts = [part.strip() for part in re.split(r'[,;/()]|\band\b', _normalize(predicted))]
+    return any(part == language or part.startswith(language + ' ') for part in parts)
+
+class CategorizationCascade:
+    def __init__(self, config, prompt):
+        self.config = config
+        pool = get_client_pool(config)
+
+        cheap_llm = pool.chat_model(config.CHEAP_LLM_MODEL, config.LLM_TEMPERATURE)
+        primary_llm = pool.chat_model(config.LLM_MODEL, config.LLM_TEMPERATURE)
+        self.cheap_chain = prompt | cheap_llm.with_structured_output(TaskCategories, include_raw=True)
+        self.primary_chain = prompt | primary_llm.with_structured_output(TaskCategories, include_raw=True)
+
+        self.attempts = 0
+        self.stats = {
+            'papers': 0,
+            'accepted_cheap': 0,
+            'escalated': 0,
+            'escalation_reasons': Counter(),
+            'cheap_seconds': 0.0,
+            'primary_seconds': 0.0,
+            'cheap_cost': 0.0,
+            'primary_cost': 0.0,
+            # what the accepted papers would have cost on the primary model
+            'primary_cost_avoided': 0.0,
+        }
+        # Mean primary-model latency measured by an earlier run, see load_previous_report
+        self.previous_primary_seconds = None
+
+    def _cost(self, model, usage):
+        input_price, output_price = self.config.MODEL_PRICES.get(model, (0.0, 0.0))
+        return (usage.get('input_tokens', 0) * input_price + usage.get('output_tokens', 0) * output_price) / 1_000_000
+
+    def _invoke(self, chain, task_description):
+        # Each model call is retried on its own, so a transient failure on the primary
+        # model does not repeat (and re-bill) the cheap call
+        start = time.perf_counter()
+        response, error, attempts = run_with_retries(
+            lambda: chain.invoke({'context': task_description}), self.config, 'categorize'
+        )
+        elapsed = time.perf_counter() - start
+        self.attempts = max(self.attempts, attempts)
+
+        if error is not None:
+            raise error
+        if response.get('parsing_error') is not None:
+            raise response['parsing_error']
+
+        usage = getattr(response['raw'], 'usage_metadata', None) or {}
+        return response['parsed'], elapsed, usage
+
+    def check(self, categories, rules, samples):
+        # Returns the reason to escalate, or None if the cheap answer can be trusted
+        for field in REQUIRED_FIELDS:
+            if _normalize(getattr(categories, field)) in VAGUE_VALUES:
+                return f'missing_{field}'
+
+        for field in ['is_programming_related', 'is_ai_related']:
+            if _normalize(getattr(categories, field)) not in ('yes', 'no'):
+                return f'invalid_{field}'
+
+        languages = rules['programming_language']
+        if languages and not _language_matches(languages[0], categories.programming_language):
+            return 'rules_disagree_programming_language'
+        if rules['is_ai_related'] and _normalize(categories.is_ai_related) != 'yes':
+            return 'rules_disagree_is_ai_related'
+
+        for sample in samples:
+            for field in CONSISTENCY_FIELDS:
+                if _normalize(getattr(sample, field)) != _normalize(getattr(categories, field)):
+                    return f'inconsistent_{field}'
+
+        return None
+
+    def categorize(self, task_description):
+        self.attempts = 0
+        self.stats['papers'] += 1
+        rules = rules_pass(task_description)
+
+        categories, elapsed, usage = self._invoke(self.cheap_chain, task_description)
+        self.stats['cheap_seconds'] += elapsed
+        cheap_cost = self._cost(self.config.CHEAP_LLM_MODEL, usage)
+        self.stats['cheap_cost'] += cheap_cost
+
+        samples = []
+        for _ in range(self.config.CASCADE_CONSISTENCY_SAMPLES - 1):
+            sample, elapsed, sample_usage = self._invoke(self.cheap_chain, task_description)
+            self.stats['cheap_seconds'] += elapsed
+            self.stats['cheap_cost'] += self._cost(self.config.CHEAP_LLM_MODEL, sample_usage)
+            samples.append(sample)
+
+        reason = self.check(categories, rules, samples)
+        if reason is None:
+            self.stats['accepted_cheap'] += 1
+            self.stats['primary_cost_avoided'] += self._cost(self.config.LLM_MODEL, usage)
+            return categories
+
+        self.stats['escalated'] += 1
+        self.stats['escalation_reasons'][reason] += 1
+
+        categories, elapsed, usage = self._invoke(self.primary_chain, task_description)
+        self.stats['primary_seconds'] += elapsed
+        self.stats['primary_cost'] += self._cost(self.config.LLM_MODEL, usage)
+
+        if not categories.programming_language and rules['programming_language']:
+            categories.programming_language = ', '.join(rules['programming_language'])
+        return categories
+
+    def load_previous_report(self, report_path):
+        if not report_path.exists():
+            return
+        with open(report_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        # Config estimates are not carried forward as if they had been measured
+        if previous.get('primary_model') == self.config.LLM_MODEL and previous.get('latency_source') in ('measured', 'previous_run'):
+            self.previous_primary_seconds = previous['mean_primary_seconds']
+
+    def primary_latency(self):
+        # (mean seconds per primary call, where the figure came from); like cost, the
+        # baseline needs a primary-model figure even when every paper was accepted cheap
+        if self.stats['escalated']:
+            return self.stats['primary_seconds'] / self.stats['escalated'], 'measured'
+        if self.previous_primary_seconds is not None:
+            return self.previous_primary_seconds, 'previous_run'
+        if self.config.LLM_MODEL in self.config.MODEL_LATENCY_SECONDS:
+            return self.config.MODEL_LATENCY_SECONDS[self.config.LLM_MODEL], 'config'
+        return None, None
+
+    def report(self):
+        stats = self.stats
+        papers = stats['papers']
+        escalated = stats['escalated']
+        mean_primary_seconds, latency_source = self.primary_latency()
+
+        report = {
+            'papers': papers,
+            'accepted_cheap': stats['accepted_cheap'],
+            'escalated': escalated,
+            'escalation_rate': escalated / papers if papers else 0.0,
+            'escalation_reasons': dict(stats['escalation_reasons']),
+            'cheap_model': self.config.CHEAP_LLM_MODEL,
+            'primary_model': self.config.LLM_MODEL,
+            'cheap_seconds': round(stats['cheap_seconds'], 2),
+            'primary_seconds': round(stats['primary_seconds'], 2),
+            'cost_usd': round(stats['cheap_cost'] + stats['primary_cost'], 4),
+            # primary-only baseline: escalated papers' real primary cost plus what the
+            # accepted ones would have cost on the primary model
+            'primary_only_cost_usd': round(stats['primary_cost'] + stats['primary_cost_avoided'], 4),
+        }
+        report['cost_saved_usd'] = round(report['primary_only_cost_usd'] - report['cost_usd'], 4)
+        if mean_primary_seconds is not None:
+            baseline_seconds = mean_primary_seconds * papers
+            report['mean_primary_seconds'] = round(mean_primary_seconds, 3)
+            report['latency_source'] = latency_source
+            report['latency_saved_seconds'] = round(baseline_seconds - stats['cheap_seconds'] - stats['primary_seconds'], 2)
+
+        return report
+
+    def print_report(self, output_path):
+        report = self.report()
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+
+        print(
+            f"Cascade: {report['accepted_cheap']}/{report['papers']} accepted from {report['cheap_model']}, "
+            f"{report['escalated']} escalated to {report['primary_model']} ({report['escalation_rate']:.0%})"
+        )
+        print(f"Cascade cost: ${report['cost_usd']:.4f} vs ${report['primary_only_cost_usd']:.4f} primary-only (saved ${report['cost_saved_usd']:.4f})")
+        if 'latency_saved_seconds' in report:
+            print(
+                f"Cascade latency saved: {report['latency_saved_seconds']:.1f}s "
+                f"(primary model at {report['mean_primary_seconds']:.2f}s per call, {report['latency_source'].replace('_', ' ')})"
+            )
+        if report['escalation_reasons']:
+            print(f"Escalation reasons: {', '.join(f'{reason}={count}' for reason, count in report['escalation_reasons'].items())}")
+        print(f"Cascade report saved to: {output_path}")
@@ -0,0 +1,145 @@
+import importlib.util
+import threading
+import time
+import httpx
+
+class ConcurrencyLimiter:
+    def __init__(self, max_in_flight):
+        self.max_in_flight = max_in_flight
+        self._semaphore = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self):
+        start = time.perf_counter()
+        self._semaphore.acquire()
+        wait = time.perf_counter() - start
+
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.total_requests += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._semaphore.release()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'max_in_flight': self.max_in_flight,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'utilisation': self.in_flight / self.max_in_flight,
+                'peak_utilisation': self.peak_in_flight / self.max_in_flight,
+                'total_requests': self.total_requests,
+                'mean_wait_s': self.total_wait / self.total_requests if self.total_requests else 0.0,
+                'max_wait_s': self.max_wait,
+            }
+
+class LimitedTransport(httpx.BaseTransport):
+    # Holds a limiter slot for the whole request, including reading the body, so the
+    # limit matches connections actually in use. Responses are buffered, which is fine
+    # because no stage streams completions.
+    def __init__(self, transport, limiter):
+        self.transport = transport
+        self.limiter = limiter
+
+    def handle_request(self, request):
+        self.limiter.acquire()
+        try:
+            response = self.transport.handle_request(request)
+            try:
+                response.read()
+            finally:
+                response.close()
+            return response
+        finally:
+            self.limiter.release()
+
+    def close(self):
+        self.transport.close()
+
+class ClientPool:
+    def __init__(self, config):
+        self.config = config
+        self.http2 = config.HTTP2 and importlib.util.find_spec('h2') is not None
+
+        limits = httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY
+        )
+        self.transport = httpx.HTTPTransport(http2=self.http2, limits=limits)
+        self.limiter = ConcurrencyLimiter(config.MAX_CONCURRENT_REQUESTS)
+
+        self.http_client = httpx.Client(
+            transport=LimitedTransport(self.transport, self.limiter),
+            timeout=httpx.Timeout(config.HTTP_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT)
+        )
+
+    def chat_model(self, model=None, temperature=None):
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=model or self.config.LLM_MODEL,
+            temperature=self.config.LLM_TEMPERATURE if temperature is None else temperature,
+            base_url=self.config.OPENAI_BASE_URL,
+            http_client=self.http_client,
+            # Retries are handled by run_with_retries, so one failure is not retried twice over
+            max_retries=0
+        )
+
+    def embeddings(self, model=None):
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(
+            model=model or self.config.EMBEDDING_MODEL,
+            base_url=self.config.OPENAI_BASE_URL,
+            http_client=self.http_client,
+            # Retries are handled by run_with_retries, so one failure is not retried twice over
+            max_retries=0
+        )
+
+    def metrics(self):
+        metrics = self.limiter.metrics()
+        metrics['http2'] = self.http2
+
+        # httpx does not expose its connection pool publicly
+        pool = getattr(self.transport, '_pool', None)
+        connections = getattr(pool, 'connections', [])
+        metrics['open_connections'] = len(connections)
+        metrics['idle_connections'] = sum(1 for connection in connections if connection.is_idle())
+        metrics['max_connections'] = self.config.HTTP_MAX_CONNECTIONS
+        return metrics
+
+    def close(self):
+        self.http_client.close()
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+def get_client_pool(config):
+    # A pool injected via config.CLIENT_POOL wins; otherwise every Config in the
+    # process shares one pool, so all stages and conferences share one limiter
+    global _shared_pool
+    if config.CLIENT_POOL is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                _shared_pool = ClientPool(config)
+        config.CLIENT_POOL = _shared_pool
+    return config.CLIENT_POOL
+
+def format_metrics(metrics):
+    return (
+        f"{metrics['total_requests']} requests, peak {metrics['peak_in_flight']}/{metrics['max_in_flight']} in flight "
+        f"({metrics['peak_utilisation']:.0%}), mean wait {metrics['mean_wait_s'] * 1000:.0f} ms, "
+        f"{metrics['open_connections']} open connections ({metrics['idle_connections']} idle), "
+        f"http2={'on' if metrics['http2'] else 'off'}"
+    )
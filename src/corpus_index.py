@@ -0,0 +1,412 @@
+import hashlib
+import json
+import faiss
+import numpy as np
+import pandas as pd
+from config import Config
+from src.embedding_backends import get_embedding_model
+from src.vector_store import load_vector_store, store_embedding_model, store_vectors
+
+INDEX_KINDS = ['chunks', 'summaries']
+
+class CorpusIndex:
+    # Corpus-level ANN indexes spanning every conference: 'chunks' holds the per-paper
+    # chunk vectors (reused from the vector stores, not re-embedded) and 'summaries'
+    # holds embeddings of the categorized task_summary values
+    def __init__(self, config):
+        self.config = config
+        self.corpus_dir = config.CORPUS_DIR
+        self.embedding_model = store_embedding_model(config, get_embedding_model(config))
+
+        self.indexes = {}
+        # Entries are mapped to index positions; removed papers leave None tombstones in
+        # place, which search() skips, until the index is compacted
+        self.entries = {}
+        # {kind: {(conference, paper_id): version}}; the version is the vector store's
+        # mtime for chunks and a hash of the summary for summaries, so re-embedded or
+        # re-categorized papers are detected and replaced
+        self.versions = {}
+        self.meta = None
+        self._results_cache = {}
+
+    def _index_path(self, kind):
+        return self.corpus_dir / f'{kind}.faiss'
+
+    def _entries_path(self, kind):
+        return self.corpus_dir / f'{kind}.json'
+
+    def _meta_path(self):
+        return self.corpus_dir / 'meta.json'
+
+    def load(self):
+        if self.meta is not None:
+            return self
+
+        if self._meta_path().exists():
+            with open(self._meta_path(), 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+            self._check_meta()
+        else:
+            self.meta = {
+                'embedding_backend': self.config.EMBEDDING_BACKEND,
+                'embedding_model': self._embedding_model_name(),
+                'index_type': self.config.CORPUS_INDEX_TYPE,
+                'dim': None
+            }
+
+        for kind in INDEX_KINDS:
+            if self._index_path(kind).exists():
+                self.indexes[kind] = faiss.read_index(str(self._index_path(kind)))
+                with open(self._entries_path(kind), 'r', encoding='utf-8') as f:
+                    self.entries[kind] = json.load(f)
+                self._set_search_params(self.indexes[kind])
+            else:
+                self.entries[kind] = []
+            # Entries from indexes built before versions were tracked get version None
+            self.versions[kind] = {(entry[0], entry[1]): None for entry in self.entries[kind] if entry is not None}
+            for conference, paper_id, version in self.meta.get('versions', {}).get(kind, []):
+                self.versions[kind][(conference, paper_id)] = version
+
+        return self
+
+    def _embedding_model_name(self):
+        if self.config.EMBEDDING_BACKEND == 'openai':
+            name = self.config.EMBEDDING_MODEL
+        else:
+            name = f'{self.config.EMBEDDING_BACKEND}-{self.config.LOCAL_EMBEDDING_DIM}'
+        if self.config.VECTOR_TRUNCATE_DIM:
+            name += f'-dim{self.config.VECTOR_TRUNCATE_DIM}'
+        return name
+
+    def _check_meta(self):
+        if self.meta['embedding_model'] != self._embedding_model_name():
+            raise ValueError(
+                f"Corpus index was built with {self.meta['embedding_model']}, "
+                f"but the current embedding model is {self._embedding_model_name()}; rebuild it with --rebuild"
+            )
+
+    def save(self):
+        self.corpus_dir.mkdir(parents=True, exist_ok=True)
+        self.meta['versions'] = {
+            kind: [[conference, paper_id, version] for (conference, paper_id), version in versions.items()]
+            for kind, versions in self.versions.items()
+        }
+        for kind, index in self.indexes.items():
+            faiss.write_index(index, str(self._index_path(kind)))
+            with open(self._entries_path(kind), 'w', encoding='utf-8') as f:
+                json.dump(self.entries[kind], f)
+        with open(self._meta_path(), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=4)
+
+    def clear(self):
+        for kind in INDEX_KINDS:
+            for path in [self._index_path(kind), self._entries_path(kind)]:
+                if path.exists():
+                    path.unlink()
+        if self._meta_path().exists():
+            self._meta_path().unlink()
+        self.indexes = {}
+        self.entries = {}
+        self.versions = {}
+        self.meta = None
+
+    def _new_index(self, dim, training_vectors):
+        index_type = self.config.CORPUS_INDEX_TYPE
+
+        if index_type == 'hnsw':
+            index = faiss.IndexHNSWFlat(dim, self.config.CORPUS_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.config.CORPUS_HNSW_EF_CONSTRUCTION
+        elif index_type == 'ivf':
+            nlist = self._ivf_nlist(len(training_vectors))
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(training_vectors)
+        elif index_type == 'flat':
+            index = faiss.IndexFlatIP(dim)
+        else:
+            raise ValueError(f"Unknown corpus index type: {index_type} (expected hnsw, ivf or flat)")
+
+        self._set_search_params(index)
+        return index
+
+    def _set_search_params(self, index):
+        if isinstance(index, faiss.IndexHNSW):
+            index.hnsw.efSearch = self.config.CORPUS_HNSW_EF_SEARCH
+        elif isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.config.CORPUS_IVF_NPROBE
+
+    def _ivf_nlist(self, total):
+        # FAISS wants ~39 training points per list; shrink nlist for small corpora
+        return max(1, min(self.config.CORPUS_IVF_NLIST, total // 39))
+
+    def _vectors(self, kind):
+        index = self.indexes[kind]
+        if isinstance(index, faiss.IndexIVF):
+            index.make_direct_map()
+        return index.reconstruct_n(0, index.ntotal)
+
+    def _live_count(self, kind):
+        return len(self.entries[kind]) - self.entries[kind].count(None)
+
+    def _needs_retrain(self, kind, added):
+        # An IVF index trained on an early, small batch keeps its few lists forever;
+        # retrain once the corpus supports at least twice as many
+        index = self.indexes[kind]
+        if not isinstance(index, faiss.IndexIVF):
+            return False
+        return self._ivf_nlist(self._live_count(kind) + added) >= 2 * index.nlist
+
+    def _live(self, kind):
+        keep = np.array([entry is not None for entry in self.entries[kind]], dtype=bool)
+        vectors = self._vectors(kind)[keep]
+        entries = [entry for entry in self.entries[kind] if entry is not None]
+        return vectors, entries
+
+    def compact(self, kind):
+        # Rebuilds the index without its tombstoned entries
+        self.load()
+        if kind not in self.indexes:
+            return 0
+        vectors, entries = self._live(kind)
+        dropped = len(self.entries[kind]) - len(entries)
+        del self.indexes[kind]
+        self.entries[kind] = entries
+        if entries:
+            self.indexes[kind] = self._new_index(vectors.shape[1], vectors)
+            self.indexes[kind].add(vectors)
+        else:
+            for path in [self._index_path(kind), self._entries_path(kind)]:
+                if path.exists():
+                    path.unlink()
+        return dropped
+
+    def _add(self, kind, vectors, entries, versions):
+        # versions: {(conference, paper_id): version} for the papers in entries
+        if not entries:
+            return 0
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+
+        if self.meta['dim'] is None:
+            self.meta['dim'] = vectors.shape[1]
+        elif vectors.shape[1] != self.meta['dim']:
+            raise ValueError(f"Vector dimension {vectors.shape[1]} does not match corpus index dimension {self.meta['dim']}")
+
+        if kind in self.indexes and self._needs_retrain(kind, len(vectors)):
+            live_vectors, self.entries[kind] = self._live(kind)
+            vectors = np.concatenate([live_vectors, vectors])
+            del self.indexes[kind]
+        if kind not in self.indexes:
+            self.indexes[kind] = self._new_index(vectors.shape[1], vectors)
+        self.indexes[kind].add(vectors)
+        self.entries[kind].extend(entries)
+        self.versions[kind].update(versions)
+        return len(entries)
+
+    def remove_papers(self, kind, papers):
+        # papers: iterable of (conference, paper_id). HNSW cannot delete vectors, so their
+        # entries are tombstoned; the index is only rebuilt once tombstones exceed
+        # CORPUS_COMPACT_RATIO of it, or by `main.py index --rebuild`
+        self.load()
+        papers = {paper for paper in papers if paper in self.versions[kind]}
+        if not papers:
+            return 0
+
+        for paper in papers:
+            del self.versions[kind][paper]
+        if kind not in self.indexes:
+            return 0
+
+        entries = self.entries[kind]
+        removed = 0
+        for position, entry in enumerate(entries):
+            if entry is not None and (entry[0], entry[1]) in papers:
+                entries[position] = None
+                removed += 1
+
+        live = self._live_count(kind)
+        if live == 0 or (len(entries) - live) / len(entries) > self.config.CORPUS_COMPACT_RATIO:
+            self.compact(kind)
+        return removed
+
+    def _store_version(self, conference_config, paper_id):
+        index_path = conference_config.VECTOR_STORE_DIR / paper_id / 'index.faiss'
+        return index_path.stat().st_mtime_ns if index_path.exists() else None
+
+    def _summary_version(self, summary):
+        return hashlib.sha1(summary.encode('utf-8')).hexdigest()[:16]
+
+    def _paper_chunk_vectors(self, conference_config, paper_id, vector_store=None):
+        if vector_store is None:
+            vector_store = load_vector_store(
+                conference_config.VECTOR_STORE_DIR / paper_id, self.embedding_model, conference_config
+            )
+
+        # Compressed stores decode back to float32; full-width stores are truncated to match
+        vectors, split_indexes = store_vectors(vector_store)
+        truncate_dim = self.config.VECTOR_TRUNCATE_DIM
+        if truncate_dim and vectors.shape[1] > truncate_dim:
+            vectors = vectors[:, :truncate_dim]
+        return vectors, split_indexes
+
+    def add_paper_chunks(self, conference, paper_id, vector_store=None):
+        # Replaces the paper's chunks if its vector store changed since it was indexed
+        self.load()
+        conference_config = Config(conference_name=conference, create_directories=False)
+        key = (conference, paper_id)
+        version = self._store_version(conference_config, paper_id)
+        if key in self.versions['chunks'] and self.versions['chunks'][key] == version:
+            return 0
+
+        self.remove_papers('chunks', [key])
+        vectors, split_indexes = self._paper_chunk_vectors(conference_config, paper_id, vector_store)
+        entries = [[conference, paper_id, split_index] for split_index in split_indexes]
+        return self._add('chunks', vectors, entries, {key: version})
+
+    def add_summaries(self, conference, results):
+        # results: {paper_id: task_summary}; changed summaries replace the indexed ones
+        self.load()
+        indexed = self.versions['summaries']
+        new = {}
+        for paper_id, summary in results.items():
+            if not summary:
+                continue
+            version = self._summary_version(summary)
+            if indexed.get((conference, paper_id), '') != version:
+                new[paper_id] = (summary, version)
+        if not new:
+            return 0
+
+        self.remove_papers('summaries', [(conference, paper_id) for paper_id in new])
+        vectors = np.array(self.embedding_model.embed_documents([summary for summary, _ in new.values()]), dtype=np.float32)
+        entries = [[conference, paper_id, None] for paper_id in new]
+        versions = {(conference, paper_id): version for paper_id, (_, version) in new.items()}
+        return self._add('summaries', vectors, entries, versions)
+
+    def update(self, conference):
+        self.load()
+        conference_config = Config(conference_name=conference, create_directories=False)
+
+        # Papers whose vector store was rebuilt or deleted since indexing are dropped
+        # first; chunks from all new papers are then added in one batch, so an IVF
+        # index is trained on the whole conference rather than on its first paper
+        indexed = {paper_id: version for (name, paper_id), version in self.versions['chunks'].items() if name == conference}
+        current = {}
+        if conference_config.VECTOR_STORE_DIR.exists():
+            for store_path in sorted(conference_config.VECTOR_STORE_DIR.iterdir()):
+                current[store_path.name] = self._store_version(conference_config, store_path.name)
+        stale = [paper_id for paper_id, version in indexed.items() if current.get(paper_id, False) != version]
+        removed_chunks = self.remove_papers('chunks', [(conference, paper_id) for paper_id in stale])
+
+        batch_vectors = []
+        batch_entries = []
+        batch_versions = {}
+        for paper_id, version in current.items():
+            if (conference, paper_id) in self.versions['chunks']:
+                continue
+            try:
+                vectors, split_indexes = self._paper_chunk_vectors(conference_config, paper_id)
+            except Exception as e:
+                print(f"Error indexing chunks for {conference}/{paper_id}: {e}")
+                continue
+            batch_vectors.append(vectors)
+            batch_entries.extend([conference, paper_id, split_index] for split_index in split_indexes)
+            batch_versions[(conference, paper_id)] = version
+        added_chunks = 0
+        if batch_entries:
+            added_chunks = self._add('chunks', np.concatenate(batch_vectors), batch_entries, batch_versions)
+
+        added_summaries = 0
+        removed_summaries = 0
+        results = self._results(conference)
+        if results is not None and 'task_summary' in results.columns:
+            summaries = results['task_summary'].dropna().to_dict()
+            dropped = [
+                (name, paper_id) for name, paper_id in self.versions['summaries']
+                if name == conference and paper_id not in summaries
+            ]
+            removed_summaries = self.remove_papers('summaries', dropped)
+            added_summaries = self.add_summaries(conference, summaries)
+
+        self.save()
+        print(
+            f"Corpus index: added {added_chunks} chunks and {added_summaries} task summaries from {conference}"
+            f" (removed {removed_chunks} stale chunks and {removed_summaries} stale summaries)"
+        )
+
+    def _results(self, conference):
+        if conference not in self._results_cache:
+            conference_config = Config(conference_name=conference, create_directories=False)
+            results_path = conference_config.RESULT_DIR / f"results_{conference}.csv"
+            if results_path.exists():
+                df = pd.read_csv(results_path, dtype='string').drop_duplicates('paper_id', keep='last')
+                self._results_cache[conference] = df.set_index('paper_id')
+            else:
+                self._results_cache[conference] = None
+        return self._results_cache[conference]
+
+    def _chunk_text(self, conference, paper_id, split_index):
+        conference_config = Config(conference_name=conference, create_directories=False)
+        split_path = conference_config.SPLIT_TEXT_DIR / f'{paper_id}.json'
+        if not split_path.exists():
+            return ''
+        with open(split_path, 'r', encoding='utf-8') as f:
+            splits = json.load(f)
+        if 0 <= split_index < len(splits):
+            return splits[split_index]['content']
+        return ''
+
+    def search(self, query, k=10, kinds=None, conferences=None):
+        self.load()
+        kinds = kinds or INDEX_KINDS
+
+        query_vector = np.array([self.embedding_model.embed_query(query)], dtype=np.float32)
+        faiss.normalize_L2(query_vector)
+
+        # Over-fetch hits, then keep the best-scoring hit per paper
+        best = {}
+        for kind in kinds:
+            index = self.indexes.get(kind)
+            if index is None or index.ntotal == 0:
+                continue
+
+            # Tombstoned positions still come back from the index, so fetch proportionally more
+            live = self._live_count(kind)
+            if live == 0:
+                continue
+            fetch = min(index.ntotal, -(-k * self.config.CORPUS_SEARCH_OVERFETCH * index.ntotal // live))
+            scores, positions = index.search(query_vector, fetch)
+            for score, position in zip(scores[0], positions[0]):
+                if position < 0 or self.entries[kind][position] is None:
+                    continue
+                conference, paper_id, ref = self.entries[kind][position]
+                if conferences and conference not in conferences:
+                    continue
+                key = (conference, paper_id)
+                if key not in best or score > best[key]['score']:
+                    best[key] = {'score': float(score), 'conference': conference, 'paper_id': paper_id, 'match': kind, 'ref': ref}
+
+        hits = sorted(best.values(), key=lambda hit: hit['score'], reverse=True)[:k]
+
+        for hit in hits:
+            ref = hit.pop('ref')
+            if hit['match'] == 'chunks':
+                hit['snippet'] = self._chunk_text(hit['conference'], hit['paper_id'], ref)
+
+            results = self._results(hit['conference'])
+            if results is not None and hit['paper_id'] in results.index:
+                row = results.loc[hit['paper_id']]
+                hit.update({column: row[column] for column in results.columns if not pd.isna(row[column])})
+
+        return hits
+
+def print_search_results(hits, elapsed):
+    print(f"{len(hits)} papers in {elapsed * 1000:.1f} ms")
+    for rank, hit in enumerate(hits, start=1):
+        print(f"{rank:>3}. [{hit['score']:.3f}] {hit['conference']}/{hit['paper_id']} ({hit['match']}) {hit.get('title', '')}")
+        for field in ['task_summary', 'programming_language', 'participant_skill_level', 'is_ai_related']:
+            if field in hit:
+                print(f"       {field}: {hit[field]}")
+        if 'snippet' in hit and 'task_summary' not in hit:
+            print(f"       snippet: {' '.join(hit['snippet'].split())[:200]}")
@@ -1,32 +1,52 @@
 import json
-import time
-from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
+from src.embedding_backends import get_embedding_model
+from src.outcomes import OK, NOT_FOUND, run_with_retries
+from src.vector_store import save_compressed, load_vector_store
 
 class Embedder:
     def __init__(self, config):
         self.config = config
-        self.embedding_model = OpenAIEmbeddings(model=self.config.EMBEDDING_MODEL)
+        self.embedding_model = get_embedding_model(self.config)
 
     def embed_split(self, split_path, output_path):
-        try:
-            time.sleep(0.5)
-
-            with open(split_path, 'r', encoding='utf-8') as f:
-                splits = json.load(f)
-
-            if not splits:
-                return
-
-            docs = [Document(page_content=split['content'], metadata=split['metadata']) for split in splits]
-            vector_store = FAISS.from_documents(docs, self.embedding_model)
-            vector_store.save_local(output_path)
-
-        except Exception as e:
-            print(f"Error embedding {split_path.name}: {e}")
-
-    def embed_all_splits(self):
+        with open(split_path, 'r', encoding='utf-8') as f:
+            splits = json.load(f)
+
+        if not splits:
+            return
+
+        if self.config.VECTOR_STORE_FORMAT != 'faiss':
+            vectors = self.embedding_model.embed_documents([split['content'] for split in splits])
+            save_compressed(
+                output_path, vectors, range(len(splits)), self.config.VECTOR_STORE_FORMAT, self.config, split_path.name
+            )
+            return load_vector_store(output_path, self.embedding_model, self.config)
+
+        docs = [Document(page_content=split['content'], metadata=split['metadata']) for split in splits]
+        vector_store = FAISS.from_documents(docs, self.embedding_model)
+        vector_store.save_local(output_path)
+        # A leftover compressed-store marker would otherwise take precedence on load
+        (output_path / 'store.json').unlink(missing_ok=True)
+        return vector_store
+
+    def embed_paper(self, paper_id):
+        split_path = self.config.SPLIT_TEXT_DIR / f'{paper_id}.json'
+        output_path = self.config.VECTOR_STORE_DIR / paper_id
+
+        vector_store, error, attempts = run_with_retries(
+            lambda: self.embed_split(split_path, output_path), self.config, paper_id
+        )
+        if error is not None:
+            self.config.outcomes.record_error('embed', paper_id, error, attempts)
+            return None
+
+        state = OK if vector_store is not None else NOT_FOUND
+        self.config.outcomes.record('embed', paper_id, state, attempts=attempts)
+        return vector_store
+
+    def embed_all_splits(self, paper_ids=None):
         split_dir = self.config.SPLIT_TEXT_DIR
         vector_store_dir = self.config.VECTOR_STORE_DIR
         split_texts = split_dir.iterdir()
@@ -35,6 +55,8 @@ class Embedder:
             paper_id = split_path.stem
             output_path = vector_store_dir / paper_id
 
+            if paper_ids is not None and paper_id not in paper_ids:
+                continue
             if output_path.exists():
                 continue
-            self.embed_split(split_path, output_path)
+            self.embed_paper(paper_id)
@@ -0,0 +1,69 @@
+import hashlib
+import re
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+class HashingEmbeddings(Embeddings):
+    # CPU-only embeddings with no downloaded weights: word unigrams and bigrams are
+    # hashed into a fixed number of signed buckets, sublinearly scaled and L2 normalized
+    def __init__(self, dim=1024):
+        self.dim = dim
+        self._bucket_cache = {}
+
+    def _features(self, text):
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        bigrams = [f'{first} {second}' for first, second in zip(tokens, tokens[1:])]
+        return tokens + bigrams
+
+    def _bucket(self, feature):
+        bucket = self._bucket_cache.get(feature)
+        if bucket is None:
+            # blake2b rather than hash() so vectors are stable across processes
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+            value = int.from_bytes(digest, 'little')
+            bucket = (value % self.dim, 1.0 if value >> 63 else -1.0)
+            self._bucket_cache[feature] = bucket
+        return bucket
+
+    def embed_array(self, texts):
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                col, sign = self._bucket(feature)
+                rows.append(row)
+                cols.append(col)
+                signs.append(sign)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), np.asarray(signs, dtype=np.float32))
+
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def embed_documents(self, texts):
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text):
+        return self.embed_array([text])[0].tolist()
+
+def _openai_backend(config):
+    from src.clients import get_client_pool
+    return get_client_pool(config).embeddings(config.EMBEDDING_MODEL)
+
+def _hashing_backend(config):
+    return HashingEmbeddings(dim=config.LOCAL_EMBEDDING_DIM)
+
+EMBEDDING_BACKENDS = {
+    'openai': _openai_backend,
+    'hashing': _hashing_backend,
+}
+
+def get_embedding_model(config):
+    backend = config.EMBEDDING_BACKEND
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (expected one of {', '.join(EMBEDDING_BACKENDS)})")
+    return EMBEDDING_BACKENDS[backend](config)
@@ -0,0 +1,114 @@
+import atexit
+import json
+import random
+import threading
+import time
+
+OK = 'ok'
+NOT_FOUND = 'not_found'
+TRANSIENT_ERROR = 'transient_error'
+PERMANENT_ERROR = 'permanent_error'
+
+ERROR_STATES = {TRANSIENT_ERROR, PERMANENT_ERROR}
+
+# Records are buffered in memory and written every SAVE_EVERY records, on flush() and at exit
+SAVE_EVERY = 100
+
+# Matched by class name so this module does not have to import openai/httpx
+TRANSIENT_EXCEPTION_NAMES = {
+    'APITimeoutError', 'APIConnectionError', 'RateLimitError', 'InternalServerError',
+    'TimeoutException', 'ConnectTimeout', 'ReadTimeout', 'WriteTimeout', 'PoolTimeout',
+    'ConnectError', 'ReadError', 'WriteError', 'RemoteProtocolError',
+}
+
+def is_transient(error):
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in TRANSIENT_EXCEPTION_NAMES for cls in type(error).__mro__)
+
+def run_with_retries(func, config, label):
+    # Returns (result, error, attempts); transient errors are retried with
+    # jittered exponential backoff, anything else fails on the first attempt
+    max_attempts = config.RETRY_MAX_ATTEMPTS
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return func(), None, attempt
+        except Exception as e:
+            if not is_transient(e) or attempt == max_attempts:
+                return None, e, attempt
+
+            delay = min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            delay *= 0.5 + random.random() / 2
+            print(f"Transient error for {label} (attempt {attempt}/{max_attempts}): {e}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+class OutcomeLog:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._outcomes = None
+        self._unsaved = 0
+        atexit.register(self.flush)
+
+    def _load(self):
+        if self._outcomes is None:
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._outcomes = json.load(f)
+            else:
+                self._outcomes = {}
+        return self._outcomes
+
+    def _save(self):
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._outcomes, f, indent=4)
+        tmp_path.replace(self.path)
+        self._unsaved = 0
+
+    def record(self, stage, paper_id, state, error=None, attempts=1):
+        with self._lock:
+            outcomes = self._load()
+            outcomes.setdefault(stage, {})[paper_id] = {
+                'state': state,
+                'error': f"{type(error).__name__}: {error}" if error is not None else None,
+                'attempts': attempts
+            }
+            self._unsaved += 1
+            if self._unsaved >= SAVE_EVERY:
+                self._save()
+
+    def flush(self):
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def record_error(self, stage, paper_id, error, attempts):
+        state = TRANSIENT_ERROR if is_transient(error) else PERMANENT_ERROR
+        print(f"Error in {stage} for {paper_id} ({state}, {attempts} attempts): {error}")
+        self.record(stage, paper_id, state, error=error, attempts=attempts)
+
+    def state(self, stage, paper_id):
+        with self._lock:
+            outcome = self._load().get(stage, {}).get(paper_id)
+        return outcome['state'] if outcome else None
+
+    def failed(self, stage):
+        with self._lock:
+            stage_outcomes = self._load().get(stage, {})
+            return {paper_id for paper_id, outcome in stage_outcomes.items() if outcome['state'] in ERROR_STATES}
+
+    def counts(self, stage):
+        counts = {}
+        with self._lock:
+            for outcome in self._load().get(stage, {}).values():
+                counts[outcome['state']] = counts.get(outcome['state'], 0) + 1
+        return counts
+
+    def clear(self, stage):
+        with self._lock:
+            outcomes = self._load()
+            if stage in outcomes:
+                del outcomes[stage]
+                self._save()
@@ -1,22 +1,213 @@
+import json
+import re
+from collections import Counter
 import pymupdf
+from src.outcomes import OK, run_with_retries
+
+BOILERPLATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'permission to make digital or hard copies',
+        r'^acm reference format',
+        r'^ccs concepts',
+        r'^additional key words and phrases',
+        r'^©\s*\d{4}',
+        r'copyright held by the owner/author',
+        r'^https?://doi\.org/\S+$',
+        r'^isbn\s',
+        r'^chi\s*[\'’]\d{2},',
+    ]
+]
+
+REFERENCES_HEADING = re.compile(r'^(\d+\s*\.?\s*)?(references|bibliography|literature cited)$', re.IGNORECASE)
+
+NUMBERED_HEADING = re.compile(r'^(\d+(\.\d+)*\.?|[A-Z]\.)\s+\S')
+
+# Checked in order, so the more specific tags win (e.g. "Study Participants")
+SECTION_TAGS = [
+    ('participants', ['participant', 'recruit', 'demographic']),
+    ('task', ['task']),
+    ('user_study', ['user study', 'study', 'evaluation', 'experiment']),
+    ('method', ['method', 'procedure', 'study design', 'apparatus', 'protocol']),
+    ('results', ['result', 'finding', 'analysis']),
+    ('discussion', ['discussion', 'limitation', 'future work', 'implication']),
+    ('conclusion', ['conclusion']),
+    ('related_work', ['related work', 'background', 'prior work']),
+    ('introduction', ['introduction']),
+    ('system', ['system', 'design', 'implementation', 'interface']),
+    ('abstract', ['abstract']),
+]
 
 class PDFParser:
     def __init__(self, config):
         self.config = config
 
     def parse_pdf(self, pdf_path, output_path):
+        if self.config.PARSE_MODE == 'layout':
+            return self.parse_pdf_layout(pdf_path, output_path)
+
         with pymupdf.open(pdf_path) as paper_pdf:
             page_texts = [page.get_text() for page in paper_pdf] # type: ignore (for Pylance)
             paper_text = '\f'.join(page_texts)
             output_path.write_text(paper_text, encoding='utf-8')
 
+        sections_path = output_path.with_suffix('.sections.json')
+        if sections_path.exists():
+            sections_path.unlink()
+        return len(paper_text), len(paper_text)
+
+    def parse_pdf_layout(self, pdf_path, output_path):
+        with pymupdf.open(pdf_path) as paper_pdf:
+            pages = [self._page_blocks(page) for page in paper_pdf] # type: ignore (for Pylance)
+
+        total_chars = sum(len(block['text']) for blocks in pages for block in blocks)
+        repeated = self._repeated_margin_lines(pages)
+        body_size = self._body_font_size(pages)
+
+        page_texts = []
+        sections = []
+        offset = 0
+        reached_references = False
+
+        for blocks in pages:
+            kept = []
+            for block in blocks:
+                text = block['text']
+                if block['in_margin'] and (self._normalize(text) in repeated or text.isdigit()):
+                    continue
+                if any(pattern.search(text) for pattern in BOILERPLATE_PATTERNS):
+                    continue
+
+                if self._is_heading(block, body_size):
+                    if REFERENCES_HEADING.match(text):
+                        reached_references = True
+                        break
+                    # offset of this block within the final joined text
+                    block_offset = offset + sum(len(t) + 1 for t in kept)
+                    sections.append({
+                        'offset': block_offset,
+                        'heading': text,
+                        'tag': self._section_tag(text)
+                    })
+
+                kept.append(text)
+
+            page_text = '\n'.join(kept)
+            page_texts.append(page_text)
+            offset += len(page_text) + 1
+
+            if reached_references:
+                break
+
+        paper_text = '\f'.join(page_texts)
+        output_path.write_text(paper_text, encoding='utf-8')
+
+        sections_path = output_path.with_suffix('.sections.json')
+        with open(sections_path, 'w', encoding='utf-8') as f:
+            json.dump(sections, f, indent=4)
+
+        return len(paper_text), total_chars
+
+    def _page_blocks(self, page):
+        page_height = page.rect.height
+        margin = page_height * self.config.PARSE_MARGIN_RATIO
+
+        blocks = []
+        for block in page.get_text('dict')['blocks']:
+            if block.get('type') != 0:
+                continue
+
+            lines = []
+            sizes = Counter()
+            bold_chars = 0
+            chars = 0
+            for line in block['lines']:
+                line_text = ''.join(span['text'] for span in line['spans']).strip()
+                if line_text:
+                    lines.append(line_text)
+                for span in line['spans']:
+                    span_chars = len(span['text'].strip())
+                    chars += span_chars
+                    sizes[round(span['size'] * 2) / 2] += span_chars
+                    if span['flags'] & 16:
+                        bold_chars += span_chars
+
+            text = ' '.join(lines) if len(lines) <= 2 else '\n'.join(lines)
+            if not text:
+                continue
+
+            y0, y1 = block['bbox'][1], block['bbox'][3]
+            blocks.append({
+                'text': text,
+                'sizes': sizes,
+                'max_size': max(sizes) if sizes else 0,
+                'is_bold': chars > 0 and bold_chars == chars,
+                'in_margin': y1 < margin or y0 > page_height - margin,
+            })
+
+        return blocks
+
+    def _normalize(self, text):
+        return re.sub(r'\s+', ' ', re.sub(r'\d+', '#', text.lower())).strip()
+
+    def _repeated_margin_lines(self, pages):
+        counts = Counter()
+        for blocks in pages:
+            counts.update({self._normalize(block['text']) for block in blocks if block['in_margin']})
+
+        min_pages = max(2, len(pages) // 2)
+        return {text for text, count in counts.items() if count >= min_pages}
+
+    def _body_font_size(self, pages):
+        sizes = Counter()
+        for blocks in pages:
+            for block in blocks:
+                sizes.update(block['sizes'])
+        return sizes.most_common(1)[0][0] if sizes else 0
+
+    def _is_heading(self, block, body_size):
+        text = block['text']
+        if '\n' in text or len(text) > 80 or text.endswith('.'):
+            return False
+        if REFERENCES_HEADING.match(text):
+            return True
+        is_larger = block['max_size'] >= body_size * 1.15
+        return is_larger or (block['is_bold'] and (NUMBERED_HEADING.match(text) or text.isupper()))
+
+    def _section_tag(self, heading):
+        heading = heading.lower()
+        for tag, keywords in SECTION_TAGS:
+            if any(keyword in heading for keyword in keywords):
+                return tag
+        return 'other'
+
+    def parse_paper(self, paper_id, pdf_path):
+        output_path = self.config.PARSED_PAPER_DIR / f'{paper_id}.txt'
+
+        chars, error, attempts = run_with_retries(
+            lambda: self.parse_pdf(pdf_path, output_path), self.config, paper_id
+        )
+        if error is not None:
+            self.config.outcomes.record_error('parse', paper_id, error, attempts)
+            return None
+
+        self.config.outcomes.record('parse', paper_id, OK, attempts=attempts)
+        return chars
+
     def parse_all_pdfs(self, papers_dict):
         parsed_dir = self.config.PARSED_PAPER_DIR
 
+        kept_chars = 0
+        total_chars = 0
         for paper_id, metadata in papers_dict.items():
             output_path = parsed_dir / f'{paper_id}.txt'
             pdf_path = metadata['pdf_path']
 
             if output_path.exists():
                 continue
-            self.parse_pdf(pdf_path, output_path)
+            chars = self.parse_paper(paper_id, pdf_path)
+            if chars is not None:
+                kept_chars += chars[0]
+                total_chars += chars[1]
+
+        if self.config.PARSE_MODE == 'layout' and total_chars:
+            print(f"Layout parsing kept {kept_chars / total_chars:.0%} of extracted text")
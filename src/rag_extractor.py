@@ -1,15 +1,16 @@
-import time
-from langchain_community.vectorstores import FAISS
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import Runnable
 from langchain_core.output_parsers import StrOutputParser
+from src.clients import get_client_pool
+from src.embedding_backends import get_embedding_model
+from src.outcomes import OK, NOT_FOUND, run_with_retries
+from src.vector_store import load_vector_store
 
 class RAGExtractor:
     def __init__(self, config):
         self.config = config
-        self.embedding_model = OpenAIEmbeddings(model=self.config.EMBEDDING_MODEL)
-        self.llm = ChatOpenAI(model=self.config.LLM_MODEL, temperature=self.config.LLM_TEMPERATURE)
+        self.embedding_model = get_embedding_model(self.config)
+        self.llm = get_client_pool(self.config).chat_model(self.config.LLM_MODEL, self.config.LLM_TEMPERATURE)
         self.setup_chain()
 
     def setup_chain(self):
@@ -22,64 +23,70 @@ class RAGExtractor:
 
         self.chain: Runnable = prompt | self.llm | StrOutputParser()
 
-    def get_context(self, paper_id):
-        try:
+    def format_chunk(self, doc):
+        # Layout parsing tags chunks with the section they came from
+        section = doc.metadata.get('section')
+        if section:
+            return f"[Section: {section}]\n{doc.page_content}"
+        return doc.page_content
+
+    def get_context(self, paper_id, vector_store=None):
+        if vector_store is None:
             vs_path = self.config.VECTOR_STORE_DIR / paper_id
 
-            vector_store = FAISS.load_local(
-                vs_path,
-                self.embedding_model,
-                allow_dangerous_deserialization=True
-            )
-
-            queries = [
-                "participants task implementation coding programming development",
-                "user study methodology procedure experiment task assignment",
-                "participants asked implement develop write code program",
-                "evaluation task programming activity coding exercise"
-            ]
-
-            all_docs = []
-            for query in queries:
-                docs = vector_store.similarity_search(query, k=2)
-                all_docs.extend(docs)
-
-            seen_content = set()
-            relevant_docs = []
-            for doc in all_docs:
-                if doc.page_content not in seen_content:
-                    seen_content.add(doc.page_content)
-                    relevant_docs.append(doc)
-
-            relevant_docs = relevant_docs[:6]
-
-            context = "\n\n".join([doc.page_content for doc in relevant_docs])
-            return context
-            
-        except Exception as e:
-            print(f"Error loading vector store for {paper_id}: {e}")
-            return ""
-
-    def extract_task(self, paper_id):
-        try:
-            time.sleep(0.5)
-
-            context = self.get_context(paper_id)
-            response = self.chain.invoke({"context": context})
-            return response
-
-        except Exception as e:
-            print(f"Error extracting task for {paper_id}: {e}")
-            return "Not found"
-
-    def extract_all_tasks(self):
+            vector_store = load_vector_store(vs_path, self.embedding_model, self.config)
+
+        all_docs = []
+        for query in self.config.RETRIEVAL_QUERIES:
+            docs = vector_store.similarity_search(query, k=self.config.RETRIEVAL_K)
+            all_docs.extend(docs)
+
+        seen_content = set()
+        relevant_docs = []
+        for doc in all_docs:
+            if doc.page_content not in seen_content:
+                seen_content.add(doc.page_content)
+                relevant_docs.append(doc)
+
+        relevant_docs = relevant_docs[:self.config.MAX_CONTEXT_CHUNKS]
+
+        context = "\n\n".join([self.format_chunk(doc) for doc in relevant_docs])
+        return context
+
+    def extract_task(self, paper_id, vector_store=None):
+        context = self.get_context(paper_id, vector_store=vector_store)
+        response = self.chain.invoke({"context": context})
+        return response
+
+    def extract_paper(self, paper_id, vector_store=None):
+        # Returns None on error so failures are never mistaken for "Not found"
+        coding_task, error, attempts = run_with_retries(
+            lambda: self.extract_task(paper_id, vector_store=vector_store), self.config, paper_id
+        )
+        if error is not None:
+            self.config.outcomes.record_error('extract', paper_id, error, attempts)
+            return None
+
+        state = NOT_FOUND if coding_task.strip() == 'Not found' else OK
+        self.config.outcomes.record('extract', paper_id, state, attempts=attempts)
+        return coding_task
+
+    def extract_all_tasks(self, paper_ids=None, on_result=None):
         vector_store_dir = self.config.VECTOR_STORE_DIR
         vector_stores = vector_store_dir.iterdir()
 
         results = {}
         for store_path in vector_stores:
             paper_id = store_path.name
-            coding_task = self.extract_task(paper_id)
+            if paper_ids is not None and paper_id not in paper_ids:
+                continue
+
+            coding_task = self.extract_paper(paper_id)
+            if coding_task is None:
+                continue
+
             results[paper_id] = coding_task
+            if on_result is not None:
+                on_result(paper_id, coding_task)
 
         return results
@@ -0,0 +1,121 @@
+import csv
+import pandas as pd
+
+METADATA_FIELDS = ['paper_id', 'title', 'authors', 'venue', 'year', 'url', 'abstract']
+
+INTERMEDIATE_FIELDS = ['paper_id', 'coding_task']
+
+CATEGORY_FIELDS = [
+    'task_summary', 'participant_skill_level', 'programming_language',
+    'programming_domain', 'programming_sub_domain', 'task_type',
+    'code_size_scope', 'evaluation_metrics', 'tools_environment', 'research_focus',
+    'is_programming_related', 'is_ai_related'
+]
+
+RESULT_FIELDS = METADATA_FIELDS + ['coding_task'] + CATEGORY_FIELDS
+
+# Rows are appended as each paper completes; the intermediate file only keeps
+# paper_id/coding_task since metadata already lives in the papers dict JSON
+class ResultWriter:
+    def __init__(self, config):
+        self.config = config
+
+    def intermediate_path(self, suffix='csv'):
+        return self.config.RESULT_DIR / f"results_{self.config.conference_name}_intermediate.{suffix}"
+
+    def results_path(self, suffix='csv'):
+        return self.config.RESULT_DIR / f"results_{self.config.conference_name}.{suffix}"
+
+    def start_intermediate(self):
+        self._reset(self.intermediate_path())
+
+    def start_results(self):
+        self._reset(self.results_path())
+
+    def append_task(self, paper_id, coding_task):
+        row = {'paper_id': paper_id, 'coding_task': coding_task}
+        self._append_row(self.intermediate_path(), INTERMEDIATE_FIELDS, row)
+
+    def append_result(self, paper_id, paper_metadata, coding_task, task_categories):
+        row = {field: paper_metadata.get(field, '') for field in METADATA_FIELDS}
+        row['paper_id'] = paper_id
+        row['coding_task'] = coding_task
+        for field in CATEGORY_FIELDS:
+            row[field] = task_categories.get(field)
+        self._append_row(self.results_path(), RESULT_FIELDS, row)
+
+    def remove_paper(self, paper_id):
+        # Watch mode reprocesses changed papers; drop their old rows so the CSVs
+        # keep one row per paper for readers that do not dedupe
+        for csv_path in [self.intermediate_path(), self.results_path()]:
+            self._remove_rows(csv_path, paper_id)
+
+    def finish_intermediate(self):
+        self._export_columnar(self.intermediate_path(), self.intermediate_path)
+        print(f"Intermediate results saved to: {self.intermediate_path()}")
+
+    def finish_results(self):
+        self._export_columnar(self.results_path(), self.results_path)
+        print(f"Results saved to: {self.results_path()}")
+
+    def read_coding_tasks(self):
+        columns = ['paper_id', 'coding_task']
+
+        parquet_path = self.intermediate_path('parquet')
+        csv_path = self.intermediate_path()
+        use_parquet = parquet_path.exists() and (
+            not csv_path.exists() or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime
+        )
+        if use_parquet:
+            df = pd.read_parquet(parquet_path, columns=columns)
+        else:
+            df = pd.read_csv(csv_path, usecols=columns, dtype='string')
+
+        return df.set_index('paper_id')['coding_task'].to_dict()
+
+    def _reset(self, csv_path):
+        if csv_path.exists():
+            csv_path.unlink()
+
+    def _remove_rows(self, csv_path, paper_id):
+        if not csv_path.exists():
+            return
+
+        with open(csv_path, 'r', newline='', encoding='utf-8') as csv_file:
+            reader = csv.DictReader(csv_file)
+            fieldnames = reader.fieldnames
+            rows = [row for row in reader if row['paper_id'] != paper_id]
+
+        if fieldnames is None:
+            return
+        with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def _append_row(self, csv_path, fieldnames, row):
+        write_header = not csv_path.exists() or csv_path.stat().st_size == 0
+
+        with open(csv_path, 'a', newline='', encoding='utf-8') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+            if write_header:
+                writer.writeheader()
+            writer.writerow(row)
+
+    def _export_columnar(self, csv_path, path_for):
+        formats = [fmt for fmt in self.config.OUTPUT_FORMATS if fmt != 'csv']
+        if not formats or not csv_path.exists():
+            return
+
+        # Reruns (--retry-failed, watch mode) append, so the latest row per paper wins
+        df = pd.read_csv(csv_path, dtype='string').drop_duplicates('paper_id', keep='last')
+        if 'year' in df.columns:
+            df['year'] = pd.to_numeric(df['year'], errors='coerce').astype('Int64')
+
+        for fmt in formats:
+            if fmt == 'parquet':
+                df.to_parquet(path_for('parquet'), index=False)
+            elif fmt == 'arrow':
+                df.to_feather(path_for('arrow'))
+            else:
+                print(f"Unknown output format: {fmt}")
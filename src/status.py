@@ -0,0 +1,69 @@
+import csv
+import json
+from src.outcomes import ERROR_STATES
+
+# Only stdlib imports here: `main.py status` must stay fast and not touch the ML stack
+
+def count_csv_rows(csv_path, column=None, exclude=None):
+    if not csv_path.exists():
+        return 0
+
+    # Rows are appended on reruns, so count each paper once using its latest row
+    latest_rows = {}
+    with open(csv_path, 'r', newline='', encoding='utf-8') as csv_file:
+        for row in csv.DictReader(csv_file):
+            latest_rows[row['paper_id']] = row
+
+    if column is None:
+        return len(latest_rows)
+    return sum(1 for row in latest_rows.values() if row.get(column) != exclude)
+
+def count_entries(directory, pattern='*'):
+    if not directory.exists():
+        return 0
+    return sum(1 for _ in directory.glob(pattern))
+
+def collect_status(config):
+    papers_path = config.DATA_DIR / f"{config.conference_name}_papers_dict.json"
+    if papers_path.exists():
+        with open(papers_path, 'r') as f:
+            total_papers = len(json.load(f))
+    else:
+        total_papers = 0
+
+    intermediate_path = config.RESULT_DIR / f"results_{config.conference_name}_intermediate.csv"
+    results_path = config.RESULT_DIR / f"results_{config.conference_name}.csv"
+
+    return {
+        'process': total_papers,
+        'parse': count_entries(config.PARSED_PAPER_DIR, '*.txt'),
+        'split': count_entries(config.SPLIT_TEXT_DIR, '*.json'),
+        'embed': sum(1 for path in config.VECTOR_STORE_DIR.glob('*') if path.is_dir()),
+        'extract': count_csv_rows(intermediate_path),
+        'extract_found': count_csv_rows(intermediate_path, column='coding_task', exclude='Not found'),
+        # watch mode writes explicit 'Not found' rows to the results
+        'categorize': count_csv_rows(results_path, column='coding_task', exclude='Not found'),
+    }
+
+def print_status(config):
+    if not config.DATA_DIR.exists():
+        print(f"{config.conference_name}: no data directory at {config.DATA_DIR}")
+        return
+
+    status = collect_status(config)
+    total = status['process']
+
+    print(f"Conference: {config.conference_name}")
+    print(f"  {'process':<12}{total:>6} papers")
+    for step in ['parse', 'split', 'embed', 'extract', 'categorize']:
+        done = status[step]
+        line = f"  {step:<12}{done:>6}"
+        if total:
+            line += f" / {total} ({done / total:.0%})"
+        if step == 'extract':
+            line += f", {status['extract_found']} with coding tasks"
+
+        errors = {state: count for state, count in config.outcomes.counts(step).items() if state in ERROR_STATES}
+        if errors:
+            line += ', ' + ', '.join(f"{count} {state}" for state, count in sorted(errors.items()))
+        print(line)
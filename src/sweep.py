@@ -0,0 +1,236 @@
+import hashlib
+import itertools
+import re
+import time
+import numpy as np
+import pandas as pd
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.embedding_backends import get_embedding_model
+from src.vector_store import load_vector_store
+
+QUOTE_PATTERN = re.compile(r'["“]([^"”]+)["”]')
+
+def normalize_text(text):
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split())
+
+def make_token_counter():
+    # tiktoken downloads its encodings on first use; fall back to ~4 chars per token offline
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding('cl100k_base')
+        return lambda text: len(encoding.encode(text))
+    except Exception:
+        return lambda text: max(1, len(text) // 4)
+
+def pareto_front(costs, recall):
+    # A setting is on the frontier if no other setting is at least as cheap in every
+    # cost with at least the same recall, and strictly better in one of them
+    pareto = []
+    for i in range(len(costs)):
+        no_worse = (costs <= costs[i]).all(axis=1) & (recall >= recall[i])
+        better = (costs < costs[i]).any(axis=1) | (recall > recall[i])
+        pareto.append(not (no_worse & better).any())
+    return pareto
+
+class ParameterSweep:
+    def __init__(self, config):
+        self.config = config
+        self.embedding_model = get_embedding_model(config)
+        self.count_tokens = make_token_counter()
+
+        self.cache_dir = config.DATA_DIR / 'sweep_cache'
+        self.cache_path = self.cache_dir / f'embeddings_{self._embedding_model_name()}.npz'
+        self.embedding_cache = self._load_cache()
+        self.cache_misses = 0
+        self.seeded = 0
+        # 'file' for --labels, 'results' when labels are quotes from past extractions
+        self.label_source = None
+
+    def _embedding_model_name(self):
+        if self.config.EMBEDDING_BACKEND == 'openai':
+            return self.config.EMBEDDING_MODEL
+        return f'{self.config.EMBEDDING_BACKEND}-{self.config.LOCAL_EMBEDDING_DIM}'
+
+    def _load_cache(self):
+        if not self.cache_path.exists():
+            return {}
+        cached = np.load(self.cache_path)
+        return dict(zip(cached['keys'].tolist(), cached['vectors']))
+
+    def _save_cache(self):
+        if not self.embedding_cache:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        keys = list(self.embedding_cache)
+        vectors = np.stack([self.embedding_cache[key] for key in keys])
+        np.savez(self.cache_path, keys=np.array(keys), vectors=vectors)
+
+    def _cache_key(self, text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def seed_cache(self, paper_ids, dim):
+        # The pipeline's own float32 stores already hold vectors for the production
+        # chunking, so grid points that reproduce those chunks need no new embeddings.
+        # Compressed stores only decode approximately and are skipped
+        seeded = 0
+        for paper_id in paper_ids:
+            store_path = self.config.VECTOR_STORE_DIR / paper_id
+            if not (store_path / 'index.pkl').exists():
+                continue
+            vector_store = load_vector_store(store_path, self.embedding_model, self.config)
+            index = vector_store.index
+            if index.d != dim:
+                continue
+
+            vectors = index.reconstruct_n(0, index.ntotal)
+            for position in range(index.ntotal):
+                doc = vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+                key = self._cache_key(doc.page_content)
+                if key not in self.embedding_cache:
+                    vector = vectors[position]
+                    self.embedding_cache[key] = vector / (np.linalg.norm(vector) or 1.0)
+                    seeded += 1
+        return seeded
+
+    def embed(self, texts):
+        # Content-addressed, so chunks shared between grid points are embedded once
+        keys = [self._cache_key(text) for text in texts]
+        missing = list({key: text for key, text in zip(keys, texts) if key not in self.embedding_cache}.items())
+        if missing:
+            vectors = self.embedding_model.embed_documents([text for _, text in missing])
+            for (key, _), vector in zip(missing, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                self.embedding_cache[key] = vector / (np.linalg.norm(vector) or 1.0)
+            self.cache_misses += len(missing)
+        return np.stack([self.embedding_cache[key] for key in keys])
+
+    def load_labels(self, labels_path=None):
+        # Returns {paper_id: [passage, ...]} with passages that occur in the parsed text
+        if labels_path is not None:
+            labels_df = pd.read_csv(labels_path, dtype='string')
+            candidates = labels_df.groupby('paper_id')['passage'].apply(list).to_dict()
+            self.label_source = 'file'
+        else:
+            candidates = self._labels_from_results()
+            self.label_source = 'results'
+
+        labels = {}
+        for paper_id, passages in candidates.items():
+            parsed_path = self.config.PARSED_PAPER_DIR / f'{paper_id}.txt'
+            if not parsed_path.exists():
+                continue
+            paper_text = normalize_text(parsed_path.read_text(encoding='utf-8'))
+            found = [passage for passage in passages if normalize_text(passage) and normalize_text(passage) in paper_text]
+            if found:
+                labels[paper_id] = found
+        return labels
+
+    def _labels_from_results(self):
+        # Past extractions quote the paper verbatim; quotes of 5+ words act as known task passages.
+        # They were quoted from context retrieved with the production settings, so recall
+        # is biased towards the production row
+        intermediate_path = self.config.RESULT_DIR / f"results_{self.config.conference_name}_intermediate.csv"
+        if not intermediate_path.exists():
+            return {}
+
+        df = pd.read_csv(intermediate_path, usecols=['paper_id', 'coding_task'], dtype='string')
+        df = df.drop_duplicates('paper_id', keep='last').dropna()
+
+        candidates = {}
+        for paper_id, coding_task in zip(df['paper_id'], df['coding_task']):
+            if coding_task.strip() == 'Not found':
+                continue
+            quotes = [quote for quote in QUOTE_PATTERN.findall(coding_task) if len(quote.split()) >= 5]
+            if quotes:
+                candidates[paper_id] = quotes
+        return candidates
+
+    def retrieve(self, chunk_vectors, query_vectors, k, max_chunks):
+        # Same policy as RAGExtractor.get_context: top-k per query, dedupe in order, cap
+        scores = query_vectors @ chunk_vectors.T
+        selected = []
+        for query_scores in scores:
+            for position in np.argsort(-query_scores, kind='stable')[:k]:
+                if position not in selected:
+                    selected.append(position)
+        return selected[:max_chunks]
+
+    def is_production(self, chunk_size, chunk_overlap, k, max_chunks):
+        config = self.config
+        return (chunk_size, chunk_overlap, k, max_chunks) == (
+            config.CHUNK_SIZE, config.CHUNK_OVERLAP, config.RETRIEVAL_K, config.MAX_CONTEXT_CHUNKS
+        )
+
+    def run(self, labels, chunk_sizes, chunk_overlaps, retrieval_ks, max_context_chunks):
+        query_vectors = self.embed(self.config.RETRIEVAL_QUERIES)
+        self.seeded = self.seed_cache(labels, query_vectors.shape[1])
+        system_prompt_tokens = self.count_tokens(self.config.SYSTEM_PROMPT)
+        paper_texts = {
+            paper_id: (self.config.PARSED_PAPER_DIR / f'{paper_id}.txt').read_text(encoding='utf-8')
+            for paper_id in labels
+        }
+        total_passages = sum(len(passages) for passages in labels.values())
+
+        rows = []
+        for chunk_size, chunk_overlap in itertools.product(chunk_sizes, chunk_overlaps):
+            if chunk_overlap >= chunk_size:
+                continue
+
+            splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+            misses_before = self.cache_misses
+            start = time.perf_counter()
+            paper_chunks = {paper_id: splitter.split_text(text) for paper_id, text in paper_texts.items()}
+            paper_vectors = {paper_id: self.embed(chunks) for paper_id, chunks in paper_chunks.items() if chunks}
+            split_embed_time = time.perf_counter() - start
+            # split_embed_s only reflects the chunks that missed the cache in this row
+            cache_misses = self.cache_misses - misses_before
+
+            chunk_count = sum(len(chunks) for chunks in paper_chunks.values())
+            embed_tokens = sum(self.count_tokens(chunk) for chunks in paper_chunks.values() for chunk in chunks)
+
+            for k, max_chunks in itertools.product(retrieval_ks, max_context_chunks):
+                start = time.perf_counter()
+                found = 0
+                prompt_tokens = 0
+                for paper_id, passages in labels.items():
+                    if paper_id not in paper_vectors:
+                        continue
+                    selected = self.retrieve(paper_vectors[paper_id], query_vectors, k, max_chunks)
+                    context = '\n\n'.join(paper_chunks[paper_id][position] for position in selected)
+                    prompt_tokens += system_prompt_tokens + self.count_tokens(context)
+
+                    normalized_context = normalize_text(context)
+                    found += sum(1 for passage in passages if normalize_text(passage) in normalized_context)
+
+                rows.append({
+                    'chunk_size': chunk_size,
+                    'chunk_overlap': chunk_overlap,
+                    'k': k,
+                    'max_chunks': max_chunks,
+                    'chunks': chunk_count,
+                    'embed_tokens': embed_tokens,
+                    'prompt_tokens': prompt_tokens,
+                    'cache_misses': cache_misses,
+                    'split_embed_s': round(split_embed_time, 3),
+                    'retrieve_s': round(time.perf_counter() - start, 3),
+                    'recall': found / total_passages if total_passages else 0.0,
+                    'production': self.is_production(chunk_size, chunk_overlap, k, max_chunks),
+                    'labels': self.label_source,
+                })
+
+        self._save_cache()
+        return self.mark_pareto(pd.DataFrame(rows))
+
+    def mark_pareto(self, df):
+        # Token cost and wall-clock time are separate frontiers: a setting can be cheap in
+        # tokens but slow to split and retrieve, and the two are not comparable units.
+        # split_embed_s only counts cache misses, so compare time on a warm cache
+        df['seconds'] = (df['split_embed_s'] + df['retrieve_s']).round(3)
+        df['pareto_tokens'] = pareto_front(df[['embed_tokens', 'prompt_tokens']].to_numpy(), df['recall'].to_numpy())
+        df['pareto_time'] = pareto_front(df[['seconds']].to_numpy(), df['recall'].to_numpy())
+        return df.sort_values(['recall', 'prompt_tokens', 'embed_tokens'], ascending=[False, True, True]).reset_index(drop=True)
+
+    def save(self, df):
+        output_path = self.config.RESULT_DIR / f"sweep_{self.config.conference_name}.csv"
+        df.to_csv(output_path, index=False)
+        print(f"Sweep results saved to: {output_path}")
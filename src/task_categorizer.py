@@ -1,7 +1,7 @@
-import time
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import Runnable
+from src.clients import get_client_pool
+from src.outcomes import OK, run_with_retries
 
 from typing import Optional
 from pydantic import BaseModel, Field
@@ -24,7 +24,7 @@ class TaskCategories(BaseModel):
 class TaskCategorizer:
     def __init__(self, config):
         self.config = config
-        self.llm = ChatOpenAI(model=self.config.LLM_MODEL, temperature=self.config.LLM_TEMPERATURE)
+        self.llm = get_client_pool(self.config).chat_model(self.config.LLM_MODEL, self.config.LLM_TEMPERATURE)
         self.llm = self.llm.with_structured_output(TaskCategories)
         self.setup_chain()
 
@@ -227,37 +227,76 @@ class TaskCategorizer:
 
         self.chain: Runnable = prompt | self.llm
 
-    def categorize_task(self, task_description):
-        try:
-            time.sleep(0.5)
+        self.cascade = None
+        if self.config.CATEGORIZER_MODE == 'cascade':
+            from src.cascade import CategorizationCascade
+            self.cascade = CategorizationCascade(self.config, prompt)
+            self.cascade.load_previous_report(self.cascade_report_path())
 
-            response = self.chain.invoke({'context' : task_description})
-            return response
+    def cascade_report_path(self):
+        return self.config.RESULT_DIR / f"categorize_report_{self.config.conference_name}.json"
 
-        except Exception as e:
-            print(f"Error categorizing task: {e}")
-            return TaskCategories(task_summary='Error processing task')
+    def save_cascade_report(self):
+        if self.cascade is not None and self.cascade.stats['papers']:
+            self.cascade.print_report(self.cascade_report_path())
 
-    def categorize_all_tasks(self, coding_tasks):
+    def categorize_task(self, task_description):
+        if self.cascade is not None:
+            return self.cascade.categorize(task_description)
+
+        response = self.chain.invoke({'context' : task_description})
+        return response
+
+    def categorize_paper(self, paper_id, task_description):
+        # Returns None on error instead of a placeholder TaskCategories
+        if self.cascade is not None:
+            # The cascade retries each model call itself; retrying it as a whole would
+            # count the paper and its cheap call again
+            try:
+                task_categories, error = self.categorize_task(task_description), None
+            except Exception as e:
+                task_categories, error = None, e
+            attempts = max(1, self.cascade.attempts)
+        else:
+            task_categories, error, attempts = run_with_retries(
+                lambda: self.categorize_task(task_description), self.config, paper_id
+            )
+        if error is not None:
+            self.config.outcomes.record_error('categorize', paper_id, error, attempts)
+            return None
+
+        self.config.outcomes.record('categorize', paper_id, OK, attempts=attempts)
+        return self.categories_to_dict(task_categories)
+
+    def categories_to_dict(self, task_categories):
+        return {
+            'task_summary' : task_categories.task_summary,
+            'participant_skill_level' : task_categories.participant_skill_level,
+            'programming_language' : task_categories.programming_language,
+            'programming_domain' : task_categories.programming_domain,
+            'programming_sub_domain' : task_categories.programming_sub_domain,
+            'task_type' : task_categories.task_type,
+            'code_size_scope' : task_categories.code_size_scope,
+            'evaluation_metrics' : task_categories.evaluation_metrics,
+            'tools_environment' : task_categories.tools_environment,
+            'research_focus' : task_categories.research_focus,
+            'is_programming_related': task_categories.is_programming_related,
+            'is_ai_related': task_categories.is_ai_related
+        }
+
+    def categorize_all_tasks(self, coding_tasks, on_result=None):
         results = {}
 
         for paper_id, task_description in coding_tasks.items():
-            if task_description == 'Not found':
+            # Empty coding_task cells come back as NA/None from CSV or Parquet
+            if not isinstance(task_description, str) or task_description.strip() == 'Not found':
+                continue
+            task_categories = self.categorize_paper(paper_id, task_description)
+            if task_categories is None:
                 continue
-            task_categories = self.categorize_task(task_description)
-            results[paper_id] = {
-                'task_summary' : task_categories.task_summary,
-                'participant_skill_level' : task_categories.participant_skill_level,
-                'programming_language' : task_categories.programming_language,
-                'programming_domain' : task_categories.programming_domain,
-                'programming_sub_domain' : task_categories.programming_sub_domain,
-                'task_type' : task_categories.task_type,
-                'code_size_scope' : task_categories.code_size_scope,
-                'evaluation_metrics' : task_categories.evaluation_metrics,
-                'tools_environment' : task_categories.tools_environment,
-                'research_focus' : task_categories.research_focus,
-                'is_programming_related': task_categories.is_programming_related,
-                'is_ai_related': task_categories.is_ai_related
-            }
+            results[paper_id] = task_categories
+            if on_result is not None:
+                on_result(paper_id, results[paper_id])
 
+        self.save_cascade_report()
         return results
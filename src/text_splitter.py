@@ -1,14 +1,25 @@
 import json
+from bisect import bisect_right
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.outcomes import OK, NOT_FOUND, run_with_retries
 
 class TextSplitter:
     def __init__(self, config):
         self.config = config
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.config.CHUNK_SIZE,
-            chunk_overlap=self.config.CHUNK_OVERLAP
+            chunk_overlap=self.config.CHUNK_OVERLAP,
+            add_start_index=True
         )
 
+    def load_sections(self, paper_path):
+        sections_path = paper_path.with_suffix('.sections.json')
+        if not sections_path.exists():
+            return []
+
+        with open(sections_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
     def split_text(self, paper_path, output_path):
         splits = []
 
@@ -17,34 +28,63 @@ class TextSplitter:
 
         # Skip empty files
         if not paper_text.strip():
-            return
+            return False
+
+        paper_splits = self.text_splitter.create_documents([paper_text])
+
+        # Section headings recorded by layout parsing, as character offsets into the text
+        sections = self.load_sections(paper_path)
+        section_offsets = [section['offset'] for section in sections]
+
+        for split_index, split_doc in enumerate(paper_splits):
+            split_text = split_doc.page_content
+            metadata = {
+                'split_index': split_index,
+                'source_file': paper_path.name,
+                'chunk_size': len(split_text),
+                'total_chunks': len(paper_splits)
+            }
 
-        paper_splits = self.text_splitter.split_text(paper_text)
+            section_index = bisect_right(section_offsets, split_doc.metadata['start_index']) - 1
+            if section_index >= 0:
+                metadata['section'] = sections[section_index]['heading']
+                metadata['section_tag'] = sections[section_index]['tag']
 
-        for split_index, split_text in enumerate(paper_splits):
             splits.append({
                 'content': split_text,
-                'metadata': {
-                    'split_index': split_index,
-                    'source_file': paper_path.name,
-                    'chunk_size': len(split_text),
-                    'total_chunks': len(paper_splits)
-                }
+                'metadata': metadata
             })
             
         with open(output_path, 'w', encoding="utf-8") as f:
             json.dump(splits, f, indent=4)
+        return True
 
-    def split_all_texts(self):
+    def split_paper(self, paper_id):
+        paper_path = self.config.PARSED_PAPER_DIR / f'{paper_id}.txt'
+        output_path = self.config.SPLIT_TEXT_DIR / f'{paper_id}.json'
+
+        has_text, error, attempts = run_with_retries(
+            lambda: self.split_text(paper_path, output_path), self.config, paper_id
+        )
+        if error is not None:
+            self.config.outcomes.record_error('split', paper_id, error, attempts)
+            return False
+
+        self.config.outcomes.record('split', paper_id, OK if has_text else NOT_FOUND, attempts=attempts)
+        return has_text
+
+    def split_all_texts(self, paper_ids=None):
         parsed_dir = self.config.PARSED_PAPER_DIR
         split_dir = self.config.SPLIT_TEXT_DIR
 
-        parsed_papers = parsed_dir.iterdir()
+        parsed_papers = parsed_dir.glob('*.txt')
 
         for paper_path in parsed_papers:
             paper_id = paper_path.stem
             output_path = split_dir / f'{paper_id}.json'
 
+            if paper_ids is not None and paper_id not in paper_ids:
+                continue
             if output_path.exists():
                 continue
-            self.split_text(paper_path, output_path)
+            self.split_paper(paper_id)
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+import faiss
+import numpy as np
+import pandas as pd
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+# Product quantization is deliberately absent: a per-paper store holds tens of vectors,
+# too few to train PQ codebooks, and the codebooks alone outweigh fp16 codes at that size
+COMPRESSED_FORMATS = ['fp16', 'sq8']
+
+class TruncatedEmbeddings(Embeddings):
+    # Keeps the first `dim` components and re-normalizes; text-embedding-3 models are
+    # trained so that truncated prefixes remain usable embeddings
+    def __init__(self, embedding_model, dim):
+        self.embedding_model = embedding_model
+        self.dim = dim
+
+    def _truncate(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)[:, :self.dim]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def embed_documents(self, texts):
+        return self._truncate(self.embedding_model.embed_documents(texts)).tolist()
+
+    def embed_query(self, text):
+        return self._truncate([self.embedding_model.embed_query(text)])[0].tolist()
+
+def store_embedding_model(config, embedding_model):
+    if config.VECTOR_TRUNCATE_DIM:
+        return TruncatedEmbeddings(embedding_model, config.VECTOR_TRUNCATE_DIM)
+    return embedding_model
+
+def build_index(vectors, store_format):
+    dim = vectors.shape[1]
+
+    if store_format == 'fp16':
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+    elif store_format == 'sq8':
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+    else:
+        raise ValueError(f"Unknown vector store format: {store_format} (expected faiss, {', '.join(COMPRESSED_FORMATS)})")
+
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+def _split_fingerprint(split_bytes):
+    return hashlib.sha1(split_bytes).hexdigest()
+
+def save_compressed(output_path, vectors, split_indexes, store_format, config, split_file):
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    truncate_dim = config.VECTOR_TRUNCATE_DIM
+    if truncate_dim and truncate_dim < vectors.shape[1]:
+        vectors = np.ascontiguousarray(vectors[:, :truncate_dim])
+        faiss.normalize_L2(vectors)
+    else:
+        truncate_dim = None
+
+    index = build_index(vectors, store_format)
+    split_bytes = (config.SPLIT_TEXT_DIR / split_file).read_bytes()
+
+    # The docstore is not copied: chunks are read back from the split JSON on load
+    output_path.mkdir(parents=True, exist_ok=True)
+    (output_path / 'index.pkl').unlink(missing_ok=True)
+    faiss.write_index(index, str(output_path / 'index.faiss'))
+    with open(output_path / 'store.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'format': store_format,
+            'dim': vectors.shape[1],
+            'truncate_dim': truncate_dim,
+            'split_file': split_file,
+            'split_sha1': _split_fingerprint(split_bytes),
+            'split_indexes': [int(split_index) for split_index in split_indexes]
+        }, f)
+
+def load_vector_store(store_path, embedding_model, config):
+    store_path = Path(store_path)
+    meta_path = store_path / 'store.json'
+    if not meta_path.exists():
+        return FAISS.load_local(store_path, embedding_model, allow_dangerous_deserialization=True)
+
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    # Chunks are looked up by position, so the split JSON must be the one the store was built from
+    split_bytes = (config.SPLIT_TEXT_DIR / meta['split_file']).read_bytes()
+    if _split_fingerprint(split_bytes) != meta['split_sha1']:
+        raise ValueError(
+            f"{meta['split_file']} changed since the vector store at {store_path} was built; re-embed this paper"
+        )
+    splits = json.loads(split_bytes)
+
+    index = faiss.read_index(str(store_path / 'index.faiss'))
+    docs = {}
+    for position, split_index in enumerate(meta['split_indexes']):
+        split = splits[split_index]
+        docs[str(position)] = Document(page_content=split['content'], metadata=split['metadata'])
+
+    # Queries must be truncated the same way as the stored vectors
+    query_model = embedding_model
+    if meta['truncate_dim'] and not isinstance(embedding_model, TruncatedEmbeddings):
+        query_model = TruncatedEmbeddings(embedding_model, meta['truncate_dim'])
+
+    return FAISS(
+        embedding_function=query_model,
+        index=index,
+        docstore=InMemoryDocstore(docs),
+        index_to_docstore_id={position: str(position) for position in range(len(docs))}
+    )
+
+def store_vectors(vector_store):
+    # Decoded vectors and their split indexes, in index order
+    index = vector_store.index
+    vectors = index.reconstruct_n(0, index.ntotal)
+    split_indexes = []
+    for position in range(index.ntotal):
+        doc = vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+        split_indexes.append(doc.metadata.get('split_index', position))
+    return vectors, split_indexes
+
+def directory_size(path):
+    return sum(file.stat().st_size for file in Path(path).iterdir() if file.is_file())
+
+class CompressionReport:
+    def __init__(self, config, embedding_model):
+        self.config = config
+        self.embedding_model = embedding_model
+
+    def select_chunks(self, index, query_vectors, k, max_chunks):
+        # Same policy as RAGExtractor.get_context, on positions instead of documents
+        _, positions = index.search(query_vectors, k)
+        selected = []
+        for query_positions in positions:
+            for position in query_positions:
+                if position >= 0 and position not in selected:
+                    selected.append(position)
+        return selected[:max_chunks]
+
+    def run(self, formats, max_papers=None):
+        config = self.config
+        full_queries = np.array(self.embedding_model.embed_documents(config.RETRIEVAL_QUERIES), dtype=np.float32)
+
+        store_paths = [
+            path for path in sorted(config.VECTOR_STORE_DIR.iterdir())
+            if (path / 'index.pkl').exists()
+        ][:max_papers]
+
+        rows = {store_format: {'papers': 0, 'bytes': 0, 'load_s': 0.0, 'agreement': 0.0} for store_format in ['faiss'] + formats}
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for store_path in store_paths:
+                paper_id = store_path.name
+
+                start = time.perf_counter()
+                original = load_vector_store(store_path, self.embedding_model, config)
+                rows['faiss']['load_s'] += time.perf_counter() - start
+                rows['faiss']['bytes'] += directory_size(store_path)
+                rows['faiss']['papers'] += 1
+                rows['faiss']['agreement'] += 1.0
+
+                vectors, split_indexes = store_vectors(original)
+                k = config.RETRIEVAL_K
+                baseline = self.select_chunks(original.index, full_queries, k, config.MAX_CONTEXT_CHUNKS)
+                baseline_splits = {split_indexes[position] for position in baseline}
+
+                for store_format in formats:
+                    output_path = Path(tmp_dir) / store_format / paper_id
+                    save_compressed(output_path, vectors, split_indexes, store_format, config, f'{paper_id}.json')
+
+                    start = time.perf_counter()
+                    compressed = load_vector_store(output_path, self.embedding_model, config)
+                    load_s = time.perf_counter() - start
+
+                    queries = full_queries
+                    if compressed.index.d < full_queries.shape[1]:
+                        queries = np.ascontiguousarray(full_queries[:, :compressed.index.d])
+                        faiss.normalize_L2(queries)
+                    selected = self.select_chunks(compressed.index, queries, k, config.MAX_CONTEXT_CHUNKS)
+                    selected_splits = {split_indexes[position] for position in selected}
+
+                    row = rows[store_format]
+                    row['papers'] += 1
+                    row['bytes'] += directory_size(output_path)
+                    row['load_s'] += load_s
+                    row['agreement'] += len(baseline_splits & selected_splits) / len(baseline_splits) if baseline_splits else 1.0
+
+                    shutil.rmtree(output_path)
+
+        baseline_bytes = rows['faiss']['bytes'] or 1
+        report = []
+        for store_format, row in rows.items():
+            papers = row['papers'] or 1
+            report.append({
+                'format': store_format,
+                'truncate_dim': config.VECTOR_TRUNCATE_DIM if store_format != 'faiss' else None,
+                'papers': row['papers'],
+                'disk_mb': round(row['bytes'] / 1_000_000, 3),
+                'size_ratio': round(row['bytes'] / baseline_bytes, 3),
+                'mean_load_ms': round(row['load_s'] / papers * 1000, 2),
+                'context_agreement': round(row['agreement'] / papers, 3),
+            })
+        return pd.DataFrame(report)
+
+    def save(self, df):
+        output_path = self.config.RESULT_DIR / f"compression_report_{self.config.conference_name}.csv"
+        df.to_csv(output_path, index=False)
+        print(f"Compression report saved to: {output_path}")
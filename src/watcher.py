@@ -0,0 +1,196 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from src.status import collect_status
+
+class PaperWatcher:
+    def __init__(self, extractor, csv_path, inbox_dir=None):
+        self.extractor = extractor
+        self.config = extractor.config
+        self.csv_path = Path(csv_path)
+        self.inbox_dir = Path(inbox_dir) if inbox_dir else self.config.DATA_DIR / 'inbox'
+        self.inbox_dir.mkdir(parents=True, exist_ok=True)
+
+        # Components are shared across the poll loop and HTTP threads, so papers
+        # are pushed through the pipeline one at a time
+        self.lock = threading.Lock()
+
+        self.csv_mtime = None
+        self.export_pending = False
+        self.paper_fingerprints = self._load_known_papers()
+        self.inbox_fingerprints = self._load_known_inbox()
+
+    def _fingerprint(self, metadata):
+        encoded = json.dumps(metadata, sort_keys=True, default=str)
+        return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+    def _load_known_papers(self):
+        papers_path = self.config.DATA_DIR / f"{self.config.conference_name}_papers_dict.json"
+        if not papers_path.exists():
+            return {}
+
+        with open(papers_path, 'r') as f:
+            papers_dict = json.load(f)
+        return {paper_id: self._fingerprint(metadata) for paper_id, metadata in papers_dict.items()}
+
+    def _load_known_inbox(self):
+        known = {}
+        for pdf_path in self.inbox_dir.glob('*.pdf'):
+            parsed_path = self.config.PARSED_PAPER_DIR / f'{pdf_path.stem}.txt'
+            if parsed_path.exists() and parsed_path.stat().st_mtime >= pdf_path.stat().st_mtime:
+                known[pdf_path.stem] = self._file_fingerprint(pdf_path)
+        return known
+
+    def _file_fingerprint(self, path):
+        stat = path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def process(self, paper_id, metadata):
+        with self.lock:
+            start = time.perf_counter()
+            try:
+                result = self.extractor.process_paper(paper_id, metadata)
+            except Exception as e:
+                print(f"Error processing {paper_id}: {e}")
+                return {'paper_id': paper_id, 'error': str(e)}
+            finally:
+                self.config.outcomes.flush()
+                self.export_pending = True
+
+            print(f"Processed {paper_id} in {time.perf_counter() - start:.1f}s")
+            return result
+
+    def export(self):
+        # Parquet/Arrow copies are rebuilt from the CSVs once per poll cycle, not per paper
+        with self.lock:
+            if not self.export_pending:
+                return
+            self.export_pending = False
+            try:
+                self.extractor.export_results()
+            except Exception as e:
+                print(f"Error exporting results: {e}")
+
+    def scan_csv(self):
+        if not self.csv_path.exists():
+            return
+
+        mtime = self.csv_path.stat().st_mtime_ns
+        if mtime == self.csv_mtime:
+            return
+        self.csv_mtime = mtime
+
+        papers_dict = self.extractor.data_processor.process_papers(self.csv_path)
+        changed = {
+            paper_id: metadata for paper_id, metadata in papers_dict.items()
+            if self.paper_fingerprints.get(paper_id) != self._fingerprint(metadata)
+        }
+        if changed:
+            print(f"Found {len(changed)} new or changed papers in {self.csv_path.name}")
+
+        for paper_id, metadata in changed.items():
+            self.process(paper_id, metadata)
+            self.paper_fingerprints[paper_id] = self._fingerprint(metadata)
+
+    def scan_inbox(self):
+        for pdf_path in sorted(self.inbox_dir.glob('*.pdf')):
+            # Skip files that may still be being copied in
+            if time.time() - pdf_path.stat().st_mtime < 2:
+                continue
+
+            paper_id = pdf_path.stem
+            fingerprint = self._file_fingerprint(pdf_path)
+            if self.inbox_fingerprints.get(paper_id) == fingerprint:
+                continue
+
+            self.process(paper_id, {'title': paper_id, 'pdf_path': str(pdf_path)})
+            self.inbox_fingerprints[paper_id] = fingerprint
+
+    def submit_pdf(self, pdf_bytes, paper_id=None):
+        if paper_id is None:
+            paper_id = hashlib.sha1(pdf_bytes).hexdigest()[:12]
+        paper_id = re.sub(r'[^A-Za-z0-9_-]', '_', paper_id)
+
+        pdf_path = self.inbox_dir / f'{paper_id}.pdf'
+        pdf_path.write_bytes(pdf_bytes)
+        self.inbox_fingerprints[paper_id] = self._file_fingerprint(pdf_path)
+
+        return self.process(paper_id, {'title': paper_id, 'pdf_path': str(pdf_path)})
+
+    def make_server(self, host, port):
+        watcher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_json(self, status, payload):
+                body = json.dumps(payload, default=str).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == '/status':
+                    self._send_json(200, collect_status(watcher.config))
+                elif path == '/metrics':
+                    pool = watcher.config.CLIENT_POOL
+                    metrics = pool.metrics() if pool is not None else {}
+                    cascade_report = watcher.extractor.cascade_report()
+                    if cascade_report is not None:
+                        metrics['cascade'] = cascade_report
+                    self._send_json(200, metrics)
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                if url.path != '/categorize':
+                    self._send_json(404, {'error': 'not found'})
+                    return
+
+                length = int(self.headers.get('Content-Length', 0))
+                if length == 0:
+                    self._send_json(400, {'error': 'request body must be a PDF'})
+                    return
+
+                paper_id = parse_qs(url.query).get('paper_id', [None])[0]
+                result = watcher.submit_pdf(self.rfile.read(length), paper_id=paper_id)
+                self._send_json(500 if 'error' in result else 200, result)
+
+            def log_message(self, format, *args):
+                return
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+    def serve_forever(self, interval=10.0, host='127.0.0.1', port=8765):
+        server = None
+        if port:
+            server = self.make_server(host, port)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            print(f"Listening on http://{host}:{port} (POST /categorize, GET /status, GET /metrics)")
+
+        print(f"Watching {self.csv_path} and {self.inbox_dir} every {interval:.0f}s")
+        try:
+            while True:
+                self.scan_csv()
+                self.scan_inbox()
+                self.export()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("Stopping watcher.")
+        finally:
+            if server is not None:
+                server.shutdown()
+            self.export()
+            # Papers are categorized one at a time here, so the cascade report is only written on exit
+            try:
+                self.extractor.save_cascade_report()
+            except Exception as e:
+                print(f"Error saving cascade report: {e}")
@@ -0,0 +1,90 @@
+import pytest
+from langchain_core.prompts import ChatPromptTemplate
+
+from config import Config
+from src.cascade import CategorizationCascade, rules_pass
+from src.task_categorizer import TaskCategories
+
+@pytest.fixture
+def cascade(monkeypatch):
+    # Building the chains does not call the API, but the OpenAI client wants a key
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    config = Config(create_directories=False)
+    prompt = ChatPromptTemplate.from_messages([('human', '{context}')])
+    return CategorizationCascade(config, prompt)
+
+def make_categories(**overrides):
+    fields = {
+        'task_summary': 'Fix failing unit tests in a web app',
+        'participant_skill_level': 'Intermediate',
+        'programming_language': 'Python',
+        'task_type': 'Debugging',
+        'is_programming_related': 'Yes',
+        'is_ai_related': 'No',
+    }
+    fields.update(overrides)
+    return TaskCategories(**fields)
+
+def test_rules_pass_detects_languages_from_keywords_and_extensions():
+    rules = rules_pass('Participants edited app.ts and ran npm install before using pandas.')
+    assert rules['programming_language'] == ['TypeScript', 'Python', 'JavaScript']
+
+def test_rules_pass_ignores_from_scratch():
+    assert rules_pass('Participants had to implement a tokenizer from scratch.')['programming_language'] == []
+    assert rules_pass('From scratch, participants built a parser in Java.')['programming_language'] == ['Java']
+
+def test_rules_pass_detects_scratch_language():
+    assert rules_pass('Children built games in Scratch.')['programming_language'] == ['Scratch']
+    assert rules_pass('a block-based editor similar to scratch')['programming_language'] == ['Scratch']
+
+def test_rules_pass_java_does_not_match_javascript():
+    assert rules_pass('Participants wrote JavaScript.')['programming_language'] == ['JavaScript']
+
+def test_rules_pass_only_asserts_ai_when_keywords_present():
+    assert rules_pass('Participants used GitHub Copilot.')['is_ai_related'] == 'Yes'
+    assert rules_pass('Participants used a debugger.')['is_ai_related'] is None
+
+def test_check_accepts_consistent_answer(cascade):
+    rules = rules_pass('Participants fixed bugs in a Python web app.')
+    assert cascade.check(make_categories(programming_language='Python 3, JavaScript'), rules, []) is None
+
+def test_check_escalates_vague_and_invalid_fields(cascade):
+    rules = {'programming_language': [], 'is_ai_related': None}
+    assert cascade.check(make_categories(participant_skill_level='Not specified'), rules, []) == 'missing_participant_skill_level'
+    assert cascade.check(make_categories(is_ai_related='Maybe'), rules, []) == 'invalid_is_ai_related'
+
+def test_check_escalates_when_rules_disagree(cascade):
+    rules = rules_pass('Participants wrote Java code.')
+    assert cascade.check(make_categories(programming_language='JavaScript'), rules, []) == 'rules_disagree_programming_language'
+
+    rules = rules_pass('Participants used ChatGPT while coding.')
+    assert cascade.check(make_categories(), rules, []) == 'rules_disagree_is_ai_related'
+
+def test_check_escalates_inconsistent_samples(cascade):
+    rules = {'programming_language': [], 'is_ai_related': None}
+    sample = make_categories(task_type='Implementation')
+    assert cascade.check(make_categories(), rules, [sample]) == 'inconsistent_task_type'
+
+def test_latency_saving_is_reported_without_escalations(cascade, tmp_path):
+    cascade.stats.update(papers=4, accepted_cheap=4, cheap_seconds=6.0)
+    report = cascade.report()
+    assert report['latency_source'] == 'config'
+    assert report['latency_saved_seconds'] == 4 * cascade.config.MODEL_LATENCY_SECONDS[cascade.config.LLM_MODEL] - 6.0
+
+    # A config figure is not carried forward as a measurement
+    report_path = tmp_path / 'categorize_report.json'
+    cascade.print_report(report_path)
+    cascade.load_previous_report(report_path)
+    assert cascade.previous_primary_seconds is None
+
+def test_latency_uses_the_last_measured_primary_latency(cascade, tmp_path):
+    cascade.stats.update(papers=2, escalated=2, primary_seconds=10.0, cheap_seconds=2.0)
+    assert cascade.report()['latency_source'] == 'measured'
+    report_path = tmp_path / 'categorize_report.json'
+    cascade.print_report(report_path)
+
+    cascade.stats.update(papers=3, escalated=0, primary_seconds=0.0, cheap_seconds=3.0)
+    cascade.load_previous_report(report_path)
+    report = cascade.report()
+    assert (report['latency_source'], report['mean_primary_seconds']) == ('previous_run', 5.0)
+    assert report['latency_saved_seconds'] == 12.0
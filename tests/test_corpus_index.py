@@ -0,0 +1,125 @@
+import json
+import os
+
+import faiss
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from config import Config
+from src.corpus_index import CorpusIndex
+from src.embedding_backends import HashingEmbeddings
+
+CONFERENCE = 'TEST24'
+
+PAPERS = {
+    'P1': ['participants wrote Python code to fix failing tests', 'the lab study lasted one hour'],
+    'P2': ['students debugged a JavaScript web application', 'sessions were recorded remotely'],
+    'P3': ['developers refactored a Java enterprise service', 'each developer worked alone'],
+}
+
+@pytest.fixture
+def make_config(tmp_path, monkeypatch):
+    # Config paths are relative to the working directory
+    monkeypatch.chdir(tmp_path)
+
+    def make_config(index_type='flat', compact_ratio=0.2):
+        config = Config(create_directories=False)
+        config.EMBEDDING_BACKEND = 'hashing'
+        config.LOCAL_EMBEDDING_DIM = 64
+        config.CORPUS_INDEX_TYPE = index_type
+        config.CORPUS_COMPACT_RATIO = compact_ratio
+        return config
+    return make_config
+
+def write_paper(paper_id, texts):
+    conference_config = Config(conference_name=CONFERENCE)
+    splits = [{'content': text, 'metadata': {'split_index': i}} for i, text in enumerate(texts)]
+    (conference_config.SPLIT_TEXT_DIR / f'{paper_id}.json').write_text(json.dumps(splits))
+
+    store_path = conference_config.VECTOR_STORE_DIR / paper_id
+    docs = [Document(page_content=split['content'], metadata=split['metadata']) for split in splits]
+    FAISS.from_documents(docs, HashingEmbeddings(dim=64)).save_local(store_path)
+    # Rewrites within the filesystem's timestamp resolution must still look like a new version
+    index_path = store_path / 'index.faiss'
+    mtime_ns = index_path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(index_path, ns=(mtime_ns, mtime_ns))
+
+def write_results(summaries):
+    conference_config = Config(conference_name=CONFERENCE)
+    lines = ['paper_id,task_summary'] + [f'{paper_id},{summary}' for paper_id, summary in summaries.items()]
+    (conference_config.RESULT_DIR / f'results_{CONFERENCE}.csv').write_text('\n'.join(lines) + '\n')
+
+def live_entries(corpus_index, kind, paper_id):
+    return [entry for entry in corpus_index.entries[kind] if entry is not None and entry[1] == paper_id]
+
+def test_reembedded_paper_replaces_its_chunks(make_config):
+    for paper_id, texts in PAPERS.items():
+        write_paper(paper_id, texts)
+    corpus_index = CorpusIndex(make_config())
+    corpus_index.update(CONFERENCE)
+    assert len(live_entries(corpus_index, 'chunks', 'P1')) == 2
+
+    write_paper('P1', ['participants built a Rust command line parser', 'pairs shared one laptop', 'tasks took two hours'])
+    corpus_index.update(CONFERENCE)
+
+    assert len(live_entries(corpus_index, 'chunks', 'P1')) == 3
+    hits = corpus_index.search('built a Rust command line parser', k=1, kinds=['chunks'])
+    assert hits[0]['paper_id'] == 'P1'
+    assert hits[0]['snippet'] == 'participants built a Rust command line parser'
+    assert all(hit.get('snippet') != PAPERS['P1'][0] for hit in corpus_index.search(PAPERS['P1'][0], k=3))
+
+def test_dropped_summary_is_removed(make_config):
+    write_results({'P1': 'fix failing Python tests', 'P2': 'debug a JavaScript web app'})
+    corpus_index = CorpusIndex(make_config())
+    corpus_index.update(CONFERENCE)
+    assert {hit['paper_id'] for hit in corpus_index.search('debug a JavaScript web app', kinds=['summaries'])} == {'P1', 'P2'}
+
+    write_results({'P1': 'fix failing Python tests'})
+    corpus_index = CorpusIndex(make_config())
+    corpus_index.update(CONFERENCE)
+
+    hits = corpus_index.search('debug a JavaScript web app', kinds=['summaries'])
+    assert [hit['paper_id'] for hit in hits] == ['P1']
+    assert (CONFERENCE, 'P2') not in CorpusIndex(make_config()).load().versions['summaries']
+
+def test_ivf_retrains_once_nlist_can_double(make_config):
+    corpus_index = CorpusIndex(make_config(index_type='ivf')).load()
+    rng = np.random.default_rng(0)
+
+    def add(paper_id, count):
+        entries = [[CONFERENCE, paper_id, i] for i in range(count)]
+        corpus_index._add('chunks', rng.random((count, 64), dtype=np.float32), entries, {(CONFERENCE, paper_id): 1})
+
+    add('P1', 100)
+    assert corpus_index.indexes['chunks'].nlist == 2
+    add('P2', 50)
+    assert corpus_index.indexes['chunks'].nlist == 2
+
+    add('P3', 250)
+    index = corpus_index.indexes['chunks']
+    assert isinstance(index, faiss.IndexIVF)
+    assert index.nlist == 10
+    assert index.ntotal == len(corpus_index.entries['chunks']) == 400
+
+@pytest.mark.parametrize('compact_ratio', [1.0, 0.0])
+def test_search_maps_positions_after_removal(make_config, compact_ratio):
+    for paper_id, texts in PAPERS.items():
+        write_paper(paper_id, texts)
+    corpus_index = CorpusIndex(make_config(index_type='hnsw', compact_ratio=compact_ratio))
+    corpus_index.update(CONFERENCE)
+
+    assert corpus_index.remove_papers('chunks', [(CONFERENCE, 'P1')]) == 2
+    tombstones = corpus_index.entries['chunks'].count(None)
+    assert tombstones == (2 if compact_ratio == 1.0 else 0)
+    corpus_index.save()
+
+    corpus_index = CorpusIndex(make_config(index_type='hnsw', compact_ratio=compact_ratio)).load()
+    assert corpus_index.entries['chunks'].count(None) == tombstones
+    assert corpus_index.indexes['chunks'].ntotal == len(corpus_index.entries['chunks'])
+    for paper_id in ['P2', 'P3']:
+        for text in PAPERS[paper_id]:
+            hit = corpus_index.search(text, k=1, kinds=['chunks'])[0]
+            assert (hit['paper_id'], hit['snippet']) == (paper_id, text)
+    assert 'P1' not in {hit['paper_id'] for hit in corpus_index.search(PAPERS['P1'][0], k=3)}
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.embedding_backends import HashingEmbeddings, get_embedding_model
+
+def test_hashing_embeddings_shape_and_norm():
+    vectors = HashingEmbeddings(dim=64).embed_array(['participants wrote Python code', 'debugging a web app'])
+    assert vectors.shape == (2, 64)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+
+def test_hashing_embeddings_are_deterministic_across_instances():
+    text = 'participants wrote Python code in VS Code'
+    first = HashingEmbeddings(dim=128).embed_query(text)
+    second = HashingEmbeddings(dim=128).embed_query(text)
+    assert first == second
+
+def test_hashing_embeddings_empty_text_is_zero_vector():
+    vector = HashingEmbeddings(dim=32).embed_query('')
+    assert vector == [0.0] * 32
+
+def test_hashing_embeddings_similar_texts_score_higher():
+    model = HashingEmbeddings(dim=1024)
+    query, close, far = model.embed_array([
+        'participants debugged Python code',
+        'participants debugged Python programs',
+        'survey of museum visitors',
+    ])
+    assert query @ close > query @ far
+
+def test_get_embedding_model_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        get_embedding_model(SimpleNamespace(EMBEDDING_BACKEND='missing'))
@@ -0,0 +1,72 @@
+import json
+from types import SimpleNamespace
+
+from src.outcomes import (
+    NOT_FOUND, OK, PERMANENT_ERROR, TRANSIENT_ERROR, OutcomeLog, is_transient, run_with_retries
+)
+
+RETRY_CONFIG = SimpleNamespace(RETRY_MAX_ATTEMPTS=3, RETRY_BASE_DELAY=0.0, RETRY_MAX_DELAY=0.0)
+
+class RateLimitError(Exception):
+    pass
+
+class SubclassedTimeout(RateLimitError):
+    pass
+
+def test_is_transient_matches_builtin_and_named_errors():
+    assert is_transient(TimeoutError())
+    assert is_transient(ConnectionResetError())
+    assert is_transient(RateLimitError())
+    assert is_transient(SubclassedTimeout())
+    assert not is_transient(ValueError())
+    assert not is_transient(FileNotFoundError())
+
+def test_run_with_retries_recovers_from_transient_errors():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TimeoutError('slow')
+        return 'done'
+
+    assert run_with_retries(flaky, RETRY_CONFIG, 'paper') == ('done', None, 3)
+
+def test_run_with_retries_gives_up_after_max_attempts():
+    def always_timeout():
+        raise TimeoutError('slow')
+
+    result, error, attempts = run_with_retries(always_timeout, RETRY_CONFIG, 'paper')
+    assert result is None
+    assert isinstance(error, TimeoutError)
+    assert attempts == 3
+
+def test_run_with_retries_does_not_retry_permanent_errors():
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError('bad input')
+
+    result, error, attempts = run_with_retries(broken, RETRY_CONFIG, 'paper')
+    assert isinstance(error, ValueError)
+    assert attempts == 1
+    assert len(calls) == 1
+
+def test_outcome_log_classifies_and_buffers_records(tmp_path):
+    path = tmp_path / 'outcomes.json'
+    outcomes = OutcomeLog(path)
+    outcomes.record('parse', 'P1', OK)
+    outcomes.record('parse', 'P2', NOT_FOUND)
+    outcomes.record_error('parse', 'P3', TimeoutError('slow'), attempts=4)
+    outcomes.record_error('parse', 'P4', ValueError('bad'), attempts=1)
+
+    assert outcomes.state('parse', 'P3') == TRANSIENT_ERROR
+    assert outcomes.state('parse', 'P4') == PERMANENT_ERROR
+    assert outcomes.failed('parse') == {'P3', 'P4'}
+    assert not path.exists()
+
+    outcomes.flush()
+    saved = json.loads(path.read_text())
+    assert saved['parse']['P1']['state'] == OK
+    assert OutcomeLog(path).counts('parse') == {OK: 1, NOT_FOUND: 1, TRANSIENT_ERROR: 1, PERMANENT_ERROR: 1}
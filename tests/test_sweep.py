@@ -0,0 +1,15 @@
+import numpy as np
+
+from src.sweep import pareto_front
+
+def test_pareto_front_keeps_only_undominated_settings():
+    costs = np.array([[100, 1000], [200, 800], [200, 1000], [50, 500]])
+    recall = np.array([0.9, 0.9, 0.8, 0.5])
+    assert pareto_front(costs, recall) == [True, True, False, True]
+
+def test_time_and_token_frontiers_differ():
+    recall = np.array([0.9, 0.9])
+    tokens = np.array([[100, 1000], [200, 2000]])
+    seconds = np.array([[5.0], [1.0]])
+    assert pareto_front(tokens, recall) == [True, False]
+    assert pareto_front(seconds, recall) == [False, True]
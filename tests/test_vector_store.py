@@ -0,0 +1,78 @@
+import json
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+import pytest
+
+from src.embedding_backends import HashingEmbeddings
+from src.vector_store import COMPRESSED_FORMATS, build_index, load_vector_store, save_compressed
+
+TEXTS = [
+    'participants wrote Python code to fix failing tests',
+    'the survey asked about museum visits',
+    'students debugged a JavaScript web application',
+    'interviews were transcribed and coded',
+]
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    return rng.random((40, 32), dtype=np.float32)
+
+@pytest.fixture
+def store(tmp_path):
+    split_dir = tmp_path / 'split'
+    split_dir.mkdir()
+    splits = [{'content': text, 'metadata': {'split_index': i}} for i, text in enumerate(TEXTS)]
+    (split_dir / 'P1.json').write_text(json.dumps(splits))
+
+    config = SimpleNamespace(SPLIT_TEXT_DIR=split_dir, VECTOR_TRUNCATE_DIM=None)
+    model = HashingEmbeddings(dim=64)
+    return config, model, tmp_path / 'vector_stores' / 'P1'
+
+@pytest.mark.parametrize('store_format, quantizer', [
+    ('fp16', faiss.ScalarQuantizer.QT_fp16),
+    ('sq8', faiss.ScalarQuantizer.QT_8bit),
+])
+def test_build_index_uses_the_requested_quantizer(vectors, store_format, quantizer):
+    index = build_index(vectors, store_format)
+    assert isinstance(index, faiss.IndexScalarQuantizer)
+    assert index.sq.qtype == quantizer
+    assert index.ntotal == len(vectors)
+
+def test_build_index_rejects_unknown_formats(vectors):
+    assert 'pq' not in COMPRESSED_FORMATS
+    with pytest.raises(ValueError):
+        build_index(vectors, 'pq')
+
+def test_fp16_reconstruction_is_close(vectors):
+    index = build_index(vectors, 'fp16')
+    assert np.allclose(index.reconstruct_n(0, index.ntotal), vectors, atol=1e-3)
+
+@pytest.mark.parametrize('store_format', COMPRESSED_FORMATS)
+def test_compressed_store_round_trip(store, store_format):
+    config, model, store_path = store
+    save_compressed(store_path, model.embed_documents(TEXTS), range(len(TEXTS)), store_format, config, 'P1.json')
+
+    assert sorted(path.name for path in store_path.iterdir()) == ['index.faiss', 'store.json']
+    vector_store = load_vector_store(store_path, model, config)
+    assert vector_store.similarity_search('debugged a JavaScript web application', k=1)[0].page_content == TEXTS[2]
+
+def test_truncated_store_truncates_queries(store):
+    config, model, store_path = store
+    config.VECTOR_TRUNCATE_DIM = 16
+    save_compressed(store_path, model.embed_documents(TEXTS), range(len(TEXTS)), 'fp16', config, 'P1.json')
+
+    vector_store = load_vector_store(store_path, model, config)
+    assert vector_store.index.d == 16
+    assert len(vector_store.embedding_function.embed_query('python tests')) == 16
+
+def test_load_refuses_a_changed_split_file(store):
+    config, model, store_path = store
+    save_compressed(store_path, model.embed_documents(TEXTS), range(len(TEXTS)), 'sq8', config, 'P1.json')
+
+    split_path = config.SPLIT_TEXT_DIR / 'P1.json'
+    split_path.write_text(json.dumps(json.loads(split_path.read_text())[:2]))
+    with pytest.raises(ValueError, match='changed since'):
+        load_vector_store(store_path, model, config)